@@ -14,6 +14,7 @@ class exception:
     INVALID_ROOM = "La sala no existe."
     ROOM_NOT_FOUND = "Room not found."
     INVALID_ARGS = "Invalid arguments provided."
+    INSUFFICIENT_ELEMENTS = "No hay unidades suficientes de los elementos solicitados en este horario."
 
     @staticmethod
     def raise_invalid_room_availability():
@@ -29,4 +30,8 @@ class exception:
 
     @staticmethod
     def raise_invalid_args():
-        raise customException(exception.INVALID_ARGS)
\ No newline at end of file
+        raise customException(exception.INVALID_ARGS)
+
+    @staticmethod
+    def raise_insufficient_elements():
+        raise customException(exception.INSUFFICIENT_ELEMENTS)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RecreativeElement', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recreativeelement',
+            name='unreturned_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
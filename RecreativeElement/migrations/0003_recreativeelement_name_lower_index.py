@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:46
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RecreativeElement', '0002_recreativeelement_unreturned_quantity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recreativeelement',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='recreative_name_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RecreativeElement', '0003_recreativeelement_name_lower_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recreativeelement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -1,7 +1,100 @@
+import threading
+from collections import OrderedDict
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
 
 
+class ElementNameCache:
+    """
+    In-process LRU of lower-cased element name -> element id, shared by the
+    request threads (every access holds a lock).
+
+    Entries are dropped when the element is saved or deleted in this process.
+    Other processes may hold stale entries, so a cached id is only trusted
+    when the row it loads still carries the requested name.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+        self._names_by_id = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            element_id = self._ids.get(name)
+            if element_id is not None:
+                self._ids.move_to_end(name)
+            return element_id
+
+    def set(self, name, element_id):
+        with self._lock:
+            self._ids[name] = element_id
+            self._ids.move_to_end(name)
+            self._names_by_id.setdefault(element_id, set()).add(name)
+            if len(self._ids) > self.maxsize:
+                old_name, old_id = self._ids.popitem(last=False)
+                self._names_by_id.get(old_id, set()).discard(old_name)
+
+    def discard_id(self, element_id):
+        with self._lock:
+            for name in self._names_by_id.pop(element_id, set()):
+                self._ids.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._names_by_id.clear()
+
+
+elementNameCache = ElementNameCache()
+
+
+class RecreativeElementQuerySet(models.QuerySet):
+    def resolve(self, identifier, hyphens_as_spaces=False):
+        """
+        Find an element by id or (case-insensitive) name in a single query.
+
+        An id match wins over a name match. Name lookups go through the
+        lower(name) index, or straight to the primary key when the name is
+        in ``elementNameCache``.
+
+        Args:
+            identifier (str): Element id or name.
+            hyphens_as_spaces (bool): Also match the name with '-' read as ' '.
+
+        Returns:
+            RecreativeElement: The element, or None if there is no match.
+        """
+        identifier = str(identifier)
+        names = {identifier.lower()}
+        if hyphens_as_spaces:
+            names.add(identifier.replace('-', ' ').lower())
+        element_id = int(identifier) if identifier.isdigit() else None
+
+        cached_ids = {elementNameCache.get(name) for name in names} - {None}
+        if cached_ids:
+            element = self._pick(self.filter(id__in=cached_ids | {element_id}), element_id, names)
+            if element is not None:
+                return element
+            for cached_id in cached_ids:
+                elementNameCache.discard_id(cached_id)
+
+        lookup = Q(name_lower__in=names)
+        if element_id is not None:
+            lookup |= Q(id=element_id)
+        element = self._pick(self.alias(name_lower=Lower('name')).filter(lookup), element_id, names)
+        if element is not None and element.id != element_id:
+            elementNameCache.set(element.name.lower(), element.id)
+        return element
+
+    def _pick(self, queryset, element_id, names):
+        candidates = list(queryset.order_by('id')[:len(names) + 1])
+        by_id = next((element for element in candidates if element.id == element_id), None)
+        return by_id or next((element for element in candidates if element.name.lower() in names), None)
+
+
 class RecreativeElement(models.Model):
 
     """
@@ -11,16 +104,25 @@ class RecreativeElement(models.Model):
         id (str): Unique identifier code for the item (primary key)
         name (str): Name/description of the recreational item
         quantity (int): Total available quantity of this item
+        unreturned_quantity (int): Units still out according to Register.remainingElements
+        updated_at (datetime): Last change to the item
     """
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100, blank=False, null = False, db_column='name')
     quantity = models.IntegerField(blank=False, null = False, db_column='quantity')
+    unreturned_quantity = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = RecreativeElementQuerySet.as_manager()
 
 
     class Meta:
         verbose_name = 'Recreational Item'
         verbose_name_plural = 'Recreational Items'
         ordering = ['name']
+        indexes = [
+            models.Index(Lower('name'), name='recreative_name_lower_idx'),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(quantity__gte=0),
@@ -31,6 +133,16 @@ class RecreativeElement(models.Model):
     def __str__(self):
             return f"{self.id} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        elementNameCache.discard_id(self.id)
+
+    def delete(self, *args, **kwargs):
+        element_id = self.id
+        result = super().delete(*args, **kwargs)
+        elementNameCache.discard_id(element_id)
+        return result
+
     def clean(self):
         """
         Validates the recreational item data before saving.
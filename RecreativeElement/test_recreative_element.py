@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.test import SimpleTestCase, TestCase
+from RecreativeElement.models import ElementNameCache, RecreativeElement, elementNameCache
+
+
+class TestRecreativeElementResolve(TestCase):
+    def setUp(self):
+        elementNameCache.clear()
+        self.chess = RecreativeElement.objects.create(name="Mesa de Ajedrez", quantity=2)
+        self.numbered = RecreativeElement.objects.create(name=str(self.chess.id), quantity=1)
+
+    def test_resolve_by_id_or_name_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(RecreativeElement.objects.resolve(str(self.chess.id)), self.chess)
+        with self.assertNumQueries(1):
+            self.assertEqual(RecreativeElement.objects.resolve("mesa de ajedrez"), self.chess)
+        self.assertIsNone(RecreativeElement.objects.resolve("Futbolín"))
+
+    def test_resolve_hyphens_as_spaces(self):
+        self.assertIsNone(RecreativeElement.objects.resolve("Mesa-de-Ajedrez"))
+        self.assertEqual(RecreativeElement.objects.resolve("Mesa-de-Ajedrez", hyphens_as_spaces=True), self.chess)
+
+    def test_name_cache_is_invalidated_on_save(self):
+        RecreativeElement.objects.resolve("Mesa de Ajedrez")
+        self.assertEqual(elementNameCache.get("mesa de ajedrez"), self.chess.id)
+
+        self.chess.name = "Ajedrez"
+        self.chess.save()
+        self.assertIsNone(elementNameCache.get("mesa de ajedrez"))
+        self.assertIsNone(RecreativeElement.objects.resolve("Mesa de Ajedrez"))
+        self.assertEqual(RecreativeElement.objects.resolve("ajedrez"), self.chess)
+
+    def test_stale_cache_entry_falls_back_to_query(self):
+        elementNameCache.set("mesa de ajedrez", self.numbered.id)
+        self.assertEqual(RecreativeElement.objects.resolve("Mesa de Ajedrez"), self.chess)
+
+
+class TestElementNameCacheThreads(SimpleTestCase):
+    def test_concurrent_get_and_evict(self):
+        names = ElementNameCache(maxsize=8)
+
+        def churn(worker):
+            for index in range(2000):
+                name = f"elemento {index % 16}"
+                names.set(name, index)
+                names.get(name)
+                names.get(f"elemento {(index + worker) % 16}")
+            return True
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            self.assertTrue(all(pool.map(churn, range(8))))
+        self.assertLessEqual(len(names._ids), 8)
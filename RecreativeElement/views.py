@@ -1,11 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from config.pagination import DefaultCursorPagination
+from config.conditional import collectionEtag, notModified
+from Exceptions.customException import customException
+from Room.models import Room
+from Reservation.inventory import freeUnits
 from .models import RecreativeElement
 from .serializers import RecreativeElementSerializer
 
 
 class RecreativeElementView(APIView):
+    cursor_ordering = 'id'
+
     def get(self, request, identifier=None):
         """
         Get all elements or a specific element by id or name.
@@ -13,16 +20,23 @@ class RecreativeElementView(APIView):
         if identifier:
             return self.getRecreativeElementByIdOrName(request, identifier)
         elements = RecreativeElement.objects.all()
-        serializer = RecreativeElementSerializer(elements, many=True)
-        return Response(serializer.data)
+        etag = collectionEtag(request, elements)
+        cached = notModified(request, etag)
+        if cached:
+            return cached
+        paginator = DefaultCursorPagination()
+        page = paginator.paginate_queryset(elements, request, view=self)
+        serializer = RecreativeElementSerializer(page, many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        response['ETag'] = etag
+        return response
 
     def getRecreativeElementByIdOrName(self, request, identifier):
         """
         Get an element by id or name.
         """
         try:
-            element = RecreativeElement.objects.filter(id=identifier).first() or \
-                      RecreativeElement.objects.filter(name=identifier).first()
+            element = RecreativeElement.objects.resolve(identifier)
             if not element:
                 return Response({"error": "RecreativeElement no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -43,8 +57,7 @@ class RecreativeElementView(APIView):
         Delete an element.
         """
         try:
-            element = RecreativeElement.objects.filter(id=identifier).first() or \
-                      RecreativeElement.objects.filter(name=identifier).first()
+            element = RecreativeElement.objects.resolve(identifier)
             if not element:
                 return Response({"error": "RecreativeElement no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -59,8 +72,7 @@ class RecreativeElementView(APIView):
         """
 
         try:
-            element = RecreativeElement.objects.filter(id=identifier).first() or \
-                      RecreativeElement.objects.filter(name=identifier).first()
+            element = RecreativeElement.objects.resolve(identifier)
             if not element:
                 return Response({"error": "RecreativeElement no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -83,12 +95,8 @@ class RecreativeElementView(APIView):
             )
 
         try:
-            try:
-                element = RecreativeElement.objects.get(id=identifier)
-            except (RecreativeElement.DoesNotExist, ValueError):
-                # blank space is replaced with a hyphen (-)
-                search_name = identifier.replace('-', ' ')
-                element = RecreativeElement.objects.filter(name__iexact=search_name).first()
+            # blank space is replaced with a hyphen (-)
+            element = RecreativeElement.objects.resolve(identifier, hyphens_as_spaces=True)
             if not element:
                 return Response(
                     {"error": "Elemento recreativo no encontrado"},
@@ -110,4 +118,39 @@ class RecreativeElementView(APIView):
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class RecreativeElementAvailabilityView(APIView):
+    cursor_ordering = 'id'
+
+    def get(self, request):
+        """
+        Units of each element free at a day and hour block.
+
+        Query params:
+            day: Día de la semana (ej. "Martes")
+            hour_block: Bloque horario (ej. "10:00-11:30")
+            elements: Optional comma separated element ids.
+        """
+        day = request.query_params.get('day')
+        hour_block = request.query_params.get('hour_block')
+        try:
+            Room.slotIndexes(day, hour_block)
+            element_ids = [int(element_id) for element_id in
+                           request.query_params.get('elements', '').split(',') if element_id]
+        except (customException, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        elements = RecreativeElement.objects.all()
+        if element_ids:
+            elements = elements.filter(id__in=element_ids)
+
+        paginator = DefaultCursorPagination()
+        page = paginator.paginate_queryset(elements, request, view=self)
+        free = freeUnits(page, day, hour_block)
+        data = [
+            {**item, 'units_free': free[item['id']]}
+            for item in RecreativeElementSerializer(page, many=True).data
+        ]
+        return paginator.get_paginated_response(data)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:45
+
+from django.db import migrations
+
+
+def remaining_units(remaining):
+    """
+    Units not yet returned per element, as Register.models.remainingUnits
+    parsed them when this migration was written.
+    """
+    items = remaining if isinstance(remaining, list) else [remaining]
+    units = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            element_id = int(item.get('codigo'))
+            amount = int(item.get('cantidad', 0))
+        except (TypeError, ValueError):
+            continue
+        if amount > 0:
+            units[element_id] = units.get(element_id, 0) + amount
+    return units
+
+
+def backfill_unreturned_quantity(apps, schema_editor):
+    Register = apps.get_model('Register', 'Register')
+    RecreativeElement = apps.get_model('RecreativeElement', 'RecreativeElement')
+    totals = {}
+    for remaining in Register.objects.values_list('remainingElements', flat=True).iterator():
+        for element_id, units in remaining_units(remaining).items():
+            totals[element_id] = totals.get(element_id, 0) + units
+    for element_id, units in totals.items():
+        RecreativeElement.objects.filter(id=element_id).update(unreturned_quantity=units)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Register', '0002_initial'),
+        ('RecreativeElement', '0002_recreativeelement_unreturned_quantity'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unreturned_quantity, migrations.RunPython.noop),
+    ]
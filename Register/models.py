@@ -1,4 +1,56 @@
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import F
+from RecreativeElement.models import RecreativeElement
+
+
+def remainingUnits(remainingElements):
+    """
+    Units not yet returned per element.
+
+    Args:
+        remainingElements: A ``{'codigo', 'nombre', 'estado', 'cantidad'}`` dict
+            or a list of them, where ``codigo`` is the RecreativeElement id.
+
+    Returns:
+        dict: {element_id: units}
+    """
+    items = remainingElements if isinstance(remainingElements, list) else [remainingElements]
+    units = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            element_id = int(item.get('codigo'))
+            amount = int(item.get('cantidad', 0))
+        except (TypeError, ValueError):
+            continue
+        if amount > 0:
+            units[element_id] = units.get(element_id, 0) + amount
+    return units
+
+
+def applyUnreturnedDelta(previous, current):
+    """
+    Move RecreativeElement.unreturned_quantity from one remainingUnits() result to another.
+    """
+    for element_id in previous.keys() | current.keys():
+        delta = current.get(element_id, 0) - previous.get(element_id, 0)
+        if delta:
+            RecreativeElement.objects.filter(id=element_id).update(
+                unreturned_quantity=F('unreturned_quantity') + delta
+            )
+
+
+def applyUserUnreturnedDelta(reservation_id, previous, current):
+    """
+    Move User.unreturned_units of the reservation's user between two remainingUnits() results.
+    """
+    delta = sum(current.values()) - sum(previous.values())
+    if delta:
+        get_user_model().objects.filter(reservations__id=reservation_id).update(
+            unreturned_units=F('unreturned_units') + delta
+        )
 
 
 class Register(models.Model):
@@ -35,3 +87,27 @@ class Register(models.Model):
 
     def __str__(self):
         return f"{self.registerId}"
+
+    def save(self, *args, **kwargs):
+        """
+        Save the register and keep RecreativeElement.unreturned_quantity and
+        the user's unreturned_units in step with the change in
+        remainingElements, in the same transaction.
+        """
+        with transaction.atomic():
+            previous = {}
+            if self.pk is not None:
+                stored = Register.objects.select_for_update().filter(pk=self.pk) \
+                    .values_list('remainingElements', flat=True).first()
+                previous = remainingUnits(stored)
+            super().save(*args, **kwargs)
+            current = remainingUnits(self.remainingElements)
+            applyUnreturnedDelta(previous, current)
+            applyUserUnreturnedDelta(self.reservationId_id, previous, current)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            remaining = remainingUnits(self.remainingElements)
+            applyUnreturnedDelta(remaining, {})
+            applyUserUnreturnedDelta(self.reservationId_id, remaining, {})
+            return super().delete(*args, **kwargs)
@@ -1,10 +1,14 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from config.pagination import DefaultCursorPagination
+from config.export import stream_export, EXPORT_FORMATS
 from .models import Register
 from .serializers import RegisterSerializer
 
 class RegisterView(APIView):
+    cursor_ordering = 'registerId'
+
     def get(self, request, identifier=None):
         """
         Get all registers or a specific register by id.
@@ -12,8 +16,10 @@ class RegisterView(APIView):
         if identifier:
             return self.getRegisterById(request, identifier)
         registers = Register.objects.all()
-        serializer = RegisterSerializer(registers, many=True)
-        return Response(serializer.data)
+        paginator = DefaultCursorPagination()
+        page = paginator.paginate_queryset(registers, request, view=self)
+        serializer = RegisterSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def getRegisterById(self, request, identifier):
         """
@@ -86,4 +92,22 @@ class RegisterView(APIView):
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class RegisterExportView(APIView):
+    def get(self, request):
+        """
+        Export all registers as JSON Lines (default) or CSV.
+        """
+        file_format = request.query_params.get('file_format', 'jsonl')
+        response = stream_export(
+            Register.objects.order_by('registerId'),
+            RegisterSerializer, file_format, 'registers'
+        )
+        if response is None:
+            return Response(
+                {"error": f"Formato no soportado. Use uno de: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return response
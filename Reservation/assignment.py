@@ -0,0 +1,72 @@
+from Room.models import Room
+from .conflicts import ConflictDetector
+from .matching import solveGroups
+
+
+def candidateRooms(rooms, capacity, element_ids):
+    """
+    Ids of the rooms able to host a need, smallest (best fitting) first.
+
+    Args:
+        rooms (list): (room_id, capacity, element ids) tuples sorted by capacity.
+        capacity (int): Personas del grupo.
+        element_ids (set): Elementos que la sala debe tener.
+    """
+    return [room_id for room_id, room_capacity, room_elements in rooms
+            if room_capacity >= capacity and element_ids <= room_elements]
+
+
+def assignRooms(needs, workers=None, today=None):
+    """
+    Assign rooms to a batch of needs maximizing the fulfilled ones.
+
+    Needs are grouped by slot: weekly needs by (day, block) and dated needs
+    by (date, block). Groups only compete for rooms inside themselves, so
+    each one is solved independently (in a process pool for large batches).
+    Weekly groups go first and their rooms are booked before the dated
+    groups are built, since a weekly booking blocks that slot every week.
+
+    Args:
+        needs (list): dicts with capacity, element_ids, day_index,
+            hour_index and reserved_date (None for weekly needs).
+        workers (int): Processes for the matching; 1 disables the pool.
+        today (date): Reference date for weekly conflicts.
+
+    Returns:
+        list: Room id assigned to each need, or None.
+    """
+    rooms = [
+        (room.id, room.capacity, {item.element_id for item in room.roomxelements_set.all()})
+        for room in Room.objects.with_elements().only('id', 'capacity')
+    ]
+    rooms.sort(key=lambda room: (room[1], room[0]))
+    dates = [need['reserved_date'] for need in needs if need['reserved_date']]
+    detector = ConflictDetector.load(
+        [room[0] for room in rooms], min(dates, default=None), max(dates, default=None), today
+    )
+    fitting = [candidateRooms(rooms, need['capacity'], need['element_ids']) for need in needs]
+    plan = [None] * len(needs)
+
+    def solvePhase(weekly):
+        groups = {}
+        for index, need in enumerate(needs):
+            if (need['reserved_date'] is None) != weekly:
+                continue
+            key = (need['reserved_date'], need['day_index'], need['hour_index'])
+            if weekly:
+                free = [room_id for room_id in fitting[index]
+                        if not detector.conflictsWeekly(room_id, need['day_index'], need['hour_index'])]
+            else:
+                free = [room_id for room_id in fitting[index]
+                        if not detector.conflictsOn(room_id, need['reserved_date'], need['hour_index'])]
+            groups.setdefault(key, {})[index] = free
+        for assigned in solveGroups(list(groups.values()), workers):
+            for index, room_id in assigned.items():
+                plan[index] = room_id
+
+    solvePhase(weekly=True)
+    for index, need in enumerate(needs):
+        if need['reserved_date'] is None and plan[index] is not None:
+            detector.bookWeekly(plan[index], need['day_index'], need['hour_index'])
+    solvePhase(weekly=False)
+    return plan
@@ -0,0 +1,186 @@
+from bisect import bisect_right
+from datetime import date
+from django.utils import timezone
+from Room.models import Room, RoomSlot, RoomWeek
+from Room.slots import slotCode
+from .models import ReservationSeries
+from .recurrence import expand
+
+SLOTS_PER_DAY = len(Room.HOURS)
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+
+
+def slotNumber(day, hour_index):
+    """
+    Position of a (date, hour block) on a single timeline of blocks.
+
+    Consecutive blocks of a day are consecutive numbers, so a range of
+    blocks (even across days) is the half-open interval [start, end).
+    """
+    return day.toordinal() * SLOTS_PER_DAY + hour_index
+
+
+def slotDate(number):
+    """
+    (date, hour_index) of a timeline position.
+    """
+    ordinal, hour_index = divmod(number, SLOTS_PER_DAY)
+    return date.fromordinal(ordinal), hour_index
+
+
+class ConflictDetector:
+    """
+    In-memory conflict checks between proposed and existing bookings.
+
+    Per room it keeps the weekly slots as a mask and every loaded dated
+    booking (RoomWeek bits and expanded series occurrences) as sorted,
+    disjoint [start, end) intervals on the block timeline, checked with one
+    binary search. Accepted proposals go into a per-room set of blocks
+    instead, so booking never shifts the sorted arrays and later proposals
+    of a batch still see the earlier ones. Validating m proposals of a few
+    blocks against n bookings costs O((n + m) log n).
+
+    Weekly proposals (no date) conflict with weekly slots, with dated
+    bookings of that weekday from ``today`` on and with series that still
+    occur on that weekday.
+    """
+    def __init__(self, today=None):
+        self.today = today or timezone.localdate()
+        self.weekly = {}
+        self.starts = {}
+        self.ends = {}
+        self.booked = {}
+        self.series = {}
+        self.upcoming = {}
+
+    @classmethod
+    def load(cls, room_ids, start=None, end=None, today=None):
+        """
+        Detector with the bookings of ``room_ids`` that can collide with
+        proposals dated between ``start`` and ``end`` (or weekly proposals).
+
+        Takes three queries: weekly slots, dated weeks and series.
+        """
+        detector = cls(today)
+        lo = min(start or detector.today, detector.today)
+        hi = max(end or lo, lo)
+        intervals = {}
+
+        for room_id, day_index, hour_index in RoomSlot.objects.filter(room_id__in=room_ids) \
+                .values_list('room_id', 'day_index', 'hour_index'):
+            detector.weekly[room_id] = detector.weekly.get(room_id, 0) | detector._bit(day_index, hour_index)
+
+        weeks = RoomWeek.objects.filter(room_id__in=room_ids, week_start__gte=Room.weekStart(lo)) \
+            .exclude(availability_mask=0).values_list('room_id', 'week_start', 'availability_mask')
+        for room_id, week_start, mask in weeks:
+            for bit in range(Room.SLOT_COUNT):
+                if mask >> bit & 1:
+                    hour_index, day_index = divmod(bit, len(Room.DAYS))
+                    number = slotNumber(week_start, hour_index) + day_index * SLOTS_PER_DAY
+                    intervals.setdefault(room_id, []).append((number, number + 1))
+                    detector._countUpcoming(room_id, week_start.toordinal() + day_index, day_index, hour_index)
+
+        series_rows = ReservationSeries.objects.filter(reservation__room_id__in=room_ids, end_date__gte=lo) \
+            .select_related('reservation')
+        for series in series_rows:
+            room_id = series.reservation.room_id
+            hour_index = Room.HOURS.get(series.reservation.reserved_hour_block)
+            if hour_index is None:
+                continue
+            detector.series.setdefault(room_id, []).append((hour_index, series))
+            for day in expand(*series.rule(), lo, hi):
+                number = slotNumber(day, hour_index)
+                intervals.setdefault(room_id, []).append((number, number + 1))
+
+        for room_id, room_intervals in intervals.items():
+            room_intervals.sort()
+            starts, ends = detector.starts.setdefault(room_id, []), detector.ends.setdefault(room_id, [])
+            for interval_start, interval_end in room_intervals:
+                if ends and interval_start <= ends[-1]:
+                    ends[-1] = max(ends[-1], interval_end)
+                else:
+                    starts.append(interval_start)
+                    ends.append(interval_end)
+        return detector
+
+    def _bit(self, day_index, hour_index):
+        return 1 << slotCode(day_index, hour_index)
+
+    def _countUpcoming(self, room_id, ordinal, day_index, hour_index):
+        if ordinal >= self.today.toordinal():
+            counts = self.upcoming.setdefault(room_id, {})
+            counts[(day_index, hour_index)] = counts.get((day_index, hour_index), 0) + 1
+
+    def conflicts(self, room_id, start, end):
+        """
+        Whether the block range [start, end) of the timeline overlaps a booking of the room.
+        """
+        starts = self.starts.get(room_id, [])
+        index = bisect_right(starts, start)
+        if index and self.ends[room_id][index - 1] > start:
+            return True
+        if index < len(starts) and starts[index] < end:
+            return True
+        booked = self.booked.get(room_id)
+        if booked and any(number in booked for number in range(start, end)):
+            return True
+
+        weekly = self.weekly.get(room_id, 0)
+        if weekly:
+            for number in range(start, min(end, start + SLOTS_PER_WEEK)):
+                day, hour_index = slotDate(number)
+                if day.weekday() < len(Room.DAYS) and weekly & self._bit(day.weekday(), hour_index):
+                    return True
+        return False
+
+    def conflictsOn(self, room_id, day, hour_index):
+        number = slotNumber(day, hour_index)
+        return self.conflicts(room_id, number, number + 1)
+
+    def conflictsWeekly(self, room_id, day_index, hour_index):
+        """
+        Whether a weekly booking of the slot collides with anything from today on.
+        """
+        if self.weekly.get(room_id, 0) & self._bit(day_index, hour_index):
+            return True
+        if self.upcoming.get(room_id, {}).get((day_index, hour_index)):
+            return True
+        return any(
+            series_hour == hour_index and series.occursWeekly(day_index, self.today)
+            for series_hour, series in self.series.get(room_id, [])
+        )
+
+    def book(self, room_id, start, end):
+        """
+        Record an accepted booking of the range [start, end).
+        """
+        booked = self.booked.setdefault(room_id, set())
+        for number in range(start, end):
+            booked.add(number)
+            day, hour_index = slotDate(number)
+            self._countUpcoming(room_id, day.toordinal(), day.weekday(), hour_index)
+
+    def bookOn(self, room_id, day, hour_index):
+        number = slotNumber(day, hour_index)
+        self.book(room_id, number, number + 1)
+
+    def bookWeekly(self, room_id, day_index, hour_index):
+        self.weekly[room_id] = self.weekly.get(room_id, 0) | self._bit(day_index, hour_index)
+
+    def validate(self, proposals):
+        """
+        Check and book a batch of ranges in order.
+
+        Args:
+            proposals (iterable): (room_id, start, end) timeline ranges.
+
+        Returns:
+            list: True for each accepted proposal, False for each conflict.
+        """
+        accepted = []
+        for room_id, start, end in proposals:
+            ok = not self.conflicts(room_id, start, end)
+            if ok:
+                self.book(room_id, start, end)
+            accepted.append(ok)
+        return accepted
@@ -0,0 +1,105 @@
+from django.db.models import Sum
+from Exceptions.customException import exception
+from RecreativeElement.models import RecreativeElement
+from Room.slots import encodeSlot
+from .models import Reservation, ReservationXElements
+
+
+def lentUnits(slots, element_ids, exclude_reservation_id=None):
+    """
+    Units of each element lent by active reservations at the given slots.
+
+    Resolved with a single GROUP BY over ReservationXElements joined to
+    Reservation on the indexed slot_code, so the cost depends on the
+    reservations of those slots only.
+
+    Args:
+        slots (set): (reserved_day, reserved_hour_block) pairs, in any
+            spelling accepted by Room.slots.
+        element_ids (iterable): Elements to count.
+        exclude_reservation_id (int): Reservation left out (the one being updated).
+
+    Returns:
+        dict: {(slot_code, element_id): units}
+    """
+    codes = {encodeSlot(day, hour_block) for day, hour_block in slots} - {None}
+    element_ids = list(element_ids)
+    if not codes or not element_ids:
+        return {}
+
+    rows = ReservationXElements.objects.filter(
+        element_id__in=element_ids, reservation__slot_code__in=codes,
+    ).exclude(reservation__state__in=Reservation.INACTIVE_STATES)
+    if exclude_reservation_id is not None:
+        rows = rows.exclude(reservation_id=exclude_reservation_id)
+
+    rows = rows.order_by().values_list('reservation__slot_code', 'element_id').annotate(units=Sum('amount'))
+    return {(code, element_id): units for code, element_id, units in rows}
+
+
+def freeUnits(elements, day, hour_block):
+    """
+    Units of each element free at a slot: stock minus unreturned units minus lent units.
+
+    Args:
+        elements (iterable): RecreativeElement instances.
+        day (str): Día de la semana (ej. "Lunes")
+        hour_block (str): Bloque horario (ej. "10:00-11:30")
+
+    Returns:
+        dict: {element_id: units}
+    """
+    elements = list(elements)
+    code = encodeSlot(day, hour_block)
+    lent = lentUnits({(day, hour_block)}, [element.id for element in elements])
+    return {
+        element.id: max(element.quantity - element.unreturned_quantity
+                        - lent.get((code, element.id), 0), 0)
+        for element in elements
+    }
+
+
+class ElementLedger:
+    """
+    Allocates element units to reservations without over-committing stock.
+
+    The requested elements are locked with SELECT ... FOR UPDATE (in id order)
+    and their lent units are loaded once, so concurrent allocations of the same
+    element queue on the row lock and each sees the previous one's reservation.
+    Must be used inside a transaction.
+    """
+    def __init__(self, element_ids, slots, exclude_reservation_id=None):
+        element_ids = sorted(set(element_ids))
+        self.elements = {
+            element.id: element
+            for element in RecreativeElement.objects.select_for_update().filter(id__in=element_ids).order_by('id')
+        } if element_ids else {}
+        self.lent = lentUnits(slots, element_ids, exclude_reservation_id)
+
+    def shortages(self, day, hour_block, amounts):
+        """
+        Element ids from ``amounts`` ({element_id: units}) that do not fit at the slot.
+        """
+        code = encodeSlot(day, hour_block)
+        short = []
+        for element_id, amount in amounts.items():
+            element = self.elements[element_id]
+            available = element.quantity - element.unreturned_quantity \
+                - self.lent.get((code, element_id), 0)
+            if amount > available:
+                short.append(element_id)
+        return short
+
+    def allocate(self, day, hour_block, amounts):
+        """
+        Reserve units for one reservation.
+
+        Raises:
+            customException: Si no hay unidades suficientes en el horario
+        """
+        if self.shortages(day, hour_block, amounts):
+            exception.raise_insufficient_elements()
+        code = encodeSlot(day, hour_block)
+        for element_id, amount in amounts.items():
+            key = (code, element_id)
+            self.lent[key] = self.lent.get(key, 0) + amount
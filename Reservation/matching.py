@@ -0,0 +1,86 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Pure matching code run by the assignment pool. It imports nothing from
+# Django, so worker processes can load it without configured settings.
+
+# Below this many slot groups the matching runs in the calling process
+PARALLEL_GROUPS = 32
+
+
+def matchGroup(candidates):
+    """
+    Maximum assignment of needs to rooms for one slot.
+
+    A greedy pass gives each need its best fitting free room, hardest
+    needs (fewest candidates) first; augmenting paths then move earlier
+    picks to other rooms whenever that fulfils one more need, so the
+    result is a maximum bipartite matching.
+
+    Args:
+        candidates (dict): {need index: [room ids, best fit first]}
+
+    Returns:
+        dict: {need index: room id} for the fulfilled needs.
+    """
+    room_owner = {}
+    assigned = {}
+    for need in sorted(candidates, key=lambda need: (len(candidates[need]), need)):
+        for room_id in candidates[need]:
+            if room_id not in room_owner:
+                room_owner[room_id] = need
+                assigned[need] = room_id
+                break
+
+    for need in candidates:
+        if need not in assigned:
+            _augment(need, candidates, room_owner, assigned)
+    return assigned
+
+
+def _augment(start, candidates, room_owner, assigned):
+    """
+    Breadth-first search for an augmenting path from an unassigned need.
+    """
+    reached_from = {}
+    queue = deque([start])
+    while queue:
+        need = queue.popleft()
+        for room_id in candidates[need]:
+            if room_id in reached_from:
+                continue
+            reached_from[room_id] = need
+            owner = room_owner.get(room_id)
+            if owner is not None:
+                queue.append(owner)
+                continue
+            # Free room: shift every need along the path to the room it reached
+            while True:
+                need = reached_from[room_id]
+                previous = assigned.get(need)
+                room_owner[room_id] = need
+                assigned[need] = room_id
+                if need == start:
+                    return True
+                room_id = previous
+    return False
+
+
+def solveGroups(groups, workers=None):
+    """
+    matchGroup of every slot group, in order.
+
+    Matching is CPU-bound Python, so large batches are spread over worker
+    processes (threads would just take turns on the GIL), one chunk of
+    groups per worker to keep the pickling down.
+
+    Args:
+        groups (list): candidates dicts, see matchGroup.
+        workers (int): Processes to use; 1 disables the pool, None uses every CPU.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(groups) < PARALLEL_GROUPS:
+        return [matchGroup(candidates) for candidates in groups]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(matchGroup, groups, chunksize=-(-len(groups) // workers)))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RecreativeElement', '0002_recreativeelement_unreturned_quantity'),
+        ('Register', '0002_initial'),
+        ('Reservation', '0005_remove_reservation_start_time_and_more'),
+        ('Room', '0008_room_capacity_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['reserved_day', 'reserved_hour_block'], name='Reservation_reserve_b69997_idx'),
+        ),
+    ]
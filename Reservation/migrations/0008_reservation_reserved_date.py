@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RecreativeElement', '0004_recreativeelement_updated_at'),
+        ('Register', '0003_backfill_unreturned_quantity'),
+        ('Reservation', '0007_reservation_updated_at'),
+        ('Room', '0010_roomweek'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='reserved_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['room', 'reserved_date', 'reserved_hour_block'], name='reservation_room_date_idx'),
+        ),
+    ]
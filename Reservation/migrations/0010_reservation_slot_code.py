@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+DAYS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sabado")
+HOURS = (
+    "7:00-8:30", "8:30-10:00", "10:00-11:30", "11:30-13:00",
+    "13:00-14:30", "14:30-16:00", "16:00-17:30", "17:30-19:00",
+)
+
+
+def backfill_slot_codes(apps, schema_editor):
+    Reservation = apps.get_model('Reservation', 'Reservation')
+    pairs = Reservation.objects.exclude(reserved_day=None).exclude(reserved_hour_block=None) \
+        .values_list('reserved_day', 'reserved_hour_block').distinct()
+    for day, hour_block in list(pairs):
+        if day in DAYS and hour_block in HOURS:
+            code = HOURS.index(hour_block) * len(DAYS) + DAYS.index(day)
+            Reservation.objects.filter(reserved_day=day, reserved_hour_block=hour_block).update(slot_code=code)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Reservation', '0009_reservationseries'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='Reservation_reserve_b69997_idx',
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='slot_code',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_slot_codes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['slot_code'], name='reservation_slot_code_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RecreativeElement', '0004_recreativeelement_updated_at'),
+        ('Register', '0003_backfill_unreturned_quantity'),
+        ('Reservation', '0010_reservation_slot_code'),
+        ('Room', '0010_roomweek'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['room', 'slot_code'], name='reservation_room_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'state'], name='reservation_user_state_idx'),
+        ),
+    ]
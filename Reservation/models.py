@@ -1,10 +1,142 @@
-from django.db import models
+from datetime import date, timedelta
+from django.db import models, transaction
+from django.db.models import F, Prefetch
+from django.db.models.functions import Now
+from django.db.models.lookups import Exact
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from RecreativeElement.models import RecreativeElement
-from Room.models import Room
+from Room.models import Room, RoomSlot, RoomWeek, RoomXElements
+from Room.cache import invalidateAvailability
+from Room.slots import encodeSlot, slotCode
+from .recurrence import WEEK, expand, firstCommonDate, weekdayBits
 from django.contrib.auth import get_user_model
 User = get_user_model() 
 from django.conf import settings
 
+
+def applyBookingDelta(removed, added):
+    """
+    Move User.active_reservations and User.upcoming_slots from one set of
+    bookings (see Reservation.booking) to another, one locked read and one
+    UPDATE per affected user. Callers run it inside their transaction.
+
+    Args:
+        removed (list): Bookings no longer active.
+        added (list): Bookings that became active.
+    """
+    removed = [booking for booking in removed if booking]
+    added = [booking for booking in added if booking]
+    for user_id in {user_id for user_id, _ in removed + added}:
+        slots = User.objects.select_for_update().filter(id=user_id) \
+            .values_list('upcoming_slots', flat=True).first()
+        if slots is None:
+            continue
+        slots = User.pruneSlots(slots)
+        delta = 0
+        for booking_user_id, slot in removed:
+            if booking_user_id == user_id:
+                delta -= 1
+                if slot in slots:
+                    slots.remove(slot)
+        for booking_user_id, slot in added:
+            if booking_user_id == user_id:
+                delta += 1
+                if slot[1] is not None:
+                    slots.append(slot)
+        User.objects.filter(id=user_id).update(
+            active_reservations=F('active_reservations') + delta, upcoming_slots=slots
+        )
+
+class ReservationQuerySet(models.QuerySet):
+    def with_details(self):
+        """
+        Join user, room and register and prefetch borrowed and room elements,
+        so serializing any number of reservations takes a constant number of queries.
+        """
+        return self.select_related('user', 'room', 'register', 'series').prefetch_related(
+            Prefetch(
+                'reservationxelements_set',
+                queryset=ReservationXElements.objects.select_related('element')
+            ),
+            Prefetch(
+                'room__roomxelements_set',
+                queryset=RoomXElements.objects.select_related('element')
+            ),
+        )
+
+    def for_fields(self, fields, room_fields=()):
+        """
+        Like with_details, restricted to what ReservationSerializer renders for
+        ``fields``: only those columns, and the joins and prefetches of the
+        nested objects that are listed.
+
+        Args:
+            fields (list): ReservationSerializer fields rendered.
+            room_fields (list): RoomReadSerializer fields rendered in room_details.
+        """
+        nested = {'user_details': 'user', 'room_details': 'room', 'recurrence': 'series'}
+        related = [nested[name] for name in fields if name in nested]
+        columns = [name for name in fields if name in ('location', 'state', 'reserved_day', 'reserved_hour_block',
+                                                        'reserved_date', 'user', 'room', 'register')]
+        reservations = self.only('id', *columns, *related)
+        if related:
+            reservations = reservations.select_related(*related)
+        if 'borrowed_elements' in fields:
+            reservations = reservations.prefetch_related(Prefetch(
+                'reservationxelements_set',
+                queryset=ReservationXElements.objects.select_related('element')
+            ))
+        if 'room_details' in fields and 'elementos' in room_fields:
+            reservations = reservations.prefetch_related(Prefetch(
+                'room__roomxelements_set',
+                queryset=RoomXElements.objects.select_related('element')
+            ))
+        return reservations
+
+    def for_room_between(self, room_id, start, end):
+        """
+        Dated reservations of a room between two dates (inclusive), in
+        calendar order. Served by the (room, reserved_date, reserved_hour_block) index.
+        """
+        return self.filter(
+            room_id=room_id, reserved_date__gte=start, reserved_date__lte=end
+        ).order_by('reserved_date', 'reserved_hour_block')
+
+    def search(self, user_id=None, room_id=None, states=(), active=False, slot_codes=(), start=None, end=None):
+        """
+        Reservations matching the list filters; every argument is optional.
+
+        user and state are served by the (user, state) index, room and slot
+        by (room, slot_code), or by the slot_code index without a room.
+        Day and block filters arrive as slot codes, so series (which have no
+        reserved_day) only match the user, room and state filters.
+
+        Args:
+            states (list): Estados aceptados.
+            active (bool): Excluir las reservas canceladas o terminadas.
+            slot_codes (list): Códigos de slot aceptados (see Room.slots).
+            start, end (date): Rango de reserved_date (inclusive).
+        """
+        reservations = self
+        if user_id is not None:
+            reservations = reservations.filter(user_id=user_id)
+        if room_id is not None:
+            reservations = reservations.filter(room_id=room_id)
+        if states:
+            reservations = reservations.filter(state__in=states)
+        if active:
+            reservations = reservations.exclude(state__in=Reservation.INACTIVE_STATES)
+        if slot_codes:
+            reservations = reservations.filter(slot_code__in=slot_codes)
+        if start is not None:
+            reservations = reservations.filter(reserved_date__gte=start)
+        if end is not None:
+            reservations = reservations.filter(reserved_date__lte=end)
+        return reservations
+
+
 class Reservation(models.Model):
     """
     Represents a reservation for a recreational element.
@@ -20,12 +152,19 @@ class Reservation(models.Model):
         borrowed_elements (ManyToMany[RecreativeElement]): Recreational elements associated with the reservation.
         reserved_day (str): Day of the week for the reservation (e.g., "Lunes").
         reserved_hour_block (str): Hour block for the reservation (e.g., "7:00-8:30").
+        reserved_date (date): Concrete date of the reservation. Empty for
+            reservations that repeat every week on reserved_day.
+        slot_code (int): reserved_day and reserved_hour_block as one slot code
+            (see Room.slots), kept in sync on save.
+        updated_at (datetime): Last change to the reservation or its borrowed elements.
     """
 
     id = models.AutoField(primary_key=True, blank=False)
 
     reserved_day = models.CharField(max_length=20, blank=True, null=True)
     reserved_hour_block = models.CharField(max_length=20, blank=True, null=True)
+    reserved_date = models.DateField(blank=True, null=True)
+    slot_code = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
 
     location = models.CharField(max_length=150, blank=False)
     state = models.CharField(max_length=150, blank=False)
@@ -33,16 +172,99 @@ class Reservation(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='room', blank=True, null=True)
     register = models.ForeignKey("Register.Register", on_delete=models.PROTECT, related_name='reservations', blank=True, null=True)
     borrowed_elements = models.ManyToManyField(RecreativeElement, through='ReservationXElements', related_name='reservations', blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = ReservationQuerySet.as_manager()
+
+    # Reservations in these states no longer hold their borrowed elements
+    INACTIVE_STATES = ("Cancelada", "Terminada")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['slot_code'], name='reservation_slot_code_idx'),
+            models.Index(fields=['room', 'reserved_date', 'reserved_hour_block'], name='reservation_room_date_idx'),
+            models.Index(fields=['room', 'slot_code'], name='reservation_room_slot_idx'),
+            models.Index(fields=['user', 'state'], name='reservation_user_state_idx'),
+        ]
 
     def __str__(self):
             return f"{self.id} - {self.user.id}"
 
+    # Columns read by booking()
+    BOOKING_FIELDS = ('state', 'user_id', 'reserved_date', 'slot_code')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(field in field_names for field in cls.BOOKING_FIELDS):
+            instance._stored_booking = instance.booking()
+        return instance
+
+    def storedBooking(self):
+        """
+        booking() as stored in the database, read again only when the
+        instance was loaded without its booking columns.
+        """
+        if not hasattr(self, '_stored_booking'):
+            stored = Reservation.objects.only(*self.BOOKING_FIELDS).filter(pk=self.pk).first()
+            self._stored_booking = stored.booking() if stored else None
+        return self._stored_booking
+
+    def booking(self):
+        """
+        (user_id, [reserved_date ISO, slot_code]) counted on the user's
+        dashboard, or None when the reservation is no longer active.
+        """
+        if self.state in self.INACTIVE_STATES or not self.user_id:
+            return None
+        reserved_date = self.reserved_date
+        if isinstance(reserved_date, date):
+            reserved_date = reserved_date.isoformat()
+        return self.user_id, [reserved_date, self.slot_code]
+
     def save(self, *args, **kwargs):
         """
-        Override save method to initialize reserved_day and reserved_hour_block
-        if they are not set yet.
+        Override save method to keep slot_code in sync with reserved_day and
+        reserved_hour_block, move the user's dashboard counters in the same
+        transaction and drop the cached availability of its room.
         """
-        super().save(*args, **kwargs)
+        self.refreshSlotCode()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'reserved_day', 'reserved_hour_block'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'slot_code'}
+        previous = None if self._state.adding else self.storedBooking()
+        current = self.booking()
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if previous != current:
+                applyBookingDelta([previous], [current])
+        self._stored_booking = current
+        if self.room_id:
+            invalidateAvailability(self.room_id)
+
+    def delete(self, *args, **kwargs):
+        room_id = self.room_id
+        result = super().delete(*args, **kwargs)
+        if room_id:
+            invalidateAvailability(room_id)
+        return result
+
+    def refreshSlotCode(self):
+        """
+        Recompute slot_code (bulk_create skips save, so batch callers call this).
+        """
+        self.slot_code = encodeSlot(self.reserved_day, self.reserved_hour_block)
+        return self
+
+@receiver(pre_delete, sender=Reservation)
+def releaseBooking(sender, instance, **kwargs):
+    """
+    Take a deleted reservation off its user's dashboard counters. A signal,
+    not Reservation.delete, so cascades (deleting its room) are counted too;
+    the collector sends it inside the deletion's transaction.
+    """
+    applyBookingDelta([instance.storedBooking()], [])
+
 
 class ReservationXElements(models.Model):
     reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE)
@@ -50,4 +272,155 @@ class ReservationXElements(models.Model):
     amount = models.PositiveIntegerField()
 
     class Meta:
-        unique_together = ('reservation', 'element')
\ No newline at end of file
+        unique_together = ('reservation', 'element')
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Reservation.objects.filter(id=self.reservation_id).update(updated_at=Now())
+
+    def delete(self, *args, **kwargs):
+        reservation_id = self.reservation_id
+        result = super().delete(*args, **kwargs)
+        Reservation.objects.filter(id=reservation_id).update(updated_at=Now())
+        return result
+
+
+class ReservationSeriesQuerySet(models.QuerySet):
+    def overlapping(self, room_id, start, end, hour_block=None):
+        """
+        Series of a room whose date range overlaps [start, end], optionally
+        restricted to one hour block.
+        """
+        series = self.filter(reservation__room_id=room_id, start_date__lte=end, end_date__gte=start)
+        if hour_block is not None:
+            series = series.filter(reservation__reserved_hour_block=hour_block)
+        return series
+
+    def occurring_on(self, room_id, hour_block, date):
+        """
+        First series of the room that books the block on ``date``, or None.
+        """
+        candidates = self.overlapping(room_id, date, date, hour_block).exclude(
+            Exact(F('weekdays').bitand(1 << date.weekday()), 0)
+        )
+        return next((series for series in candidates if series.occursOn(date)), None)
+
+    def week_mask(self, room_id, week_start):
+        """
+        Slots of one week booked by series of the room, packed like Room.availability_mask.
+        """
+        week_end = week_start + WEEK - timedelta(days=1)
+        mask = 0
+        for series in self.overlapping(room_id, week_start, week_end).select_related('reservation'):
+            hour_index = Room.HOURS.get(series.reservation.reserved_hour_block)
+            if hour_index is None:
+                continue
+            for day in series.occurrences(week_start, week_end):
+                mask |= 1 << slotCode(day.weekday(), hour_index)
+        return mask
+
+    def upcoming_weekly(self, room_id, hour_block, day_index):
+        """
+        Whether a series of the room books the block on that weekday from today on.
+        """
+        today = timezone.localdate()
+        return any(
+            series.occursWeekly(day_index, today)
+            for series in self.overlapping(room_id, today, date.max, hour_block).exclude(
+                Exact(F('weekdays').bitand(1 << day_index), 0)
+            )
+        )
+
+
+class ReservationSeries(models.Model):
+    """
+    Weekly recurrence of a reservation (RRULE-like): the reservation's room
+    and hour block repeat on the given weekdays between two dates, except on
+    the listed dates. Occurrences are never stored, they are expanded lazily.
+
+    Attributes:
+        reservation (Reservation): Reservation the rule belongs to.
+        weekdays (int): Mask of weekdays, bit ``Room.DAYS`` index.
+        start_date (date): First day of the series.
+        end_date (date): Last day of the series.
+        exceptions (list): ISO dates on which the series does not occur.
+    """
+    reservation = models.OneToOneField(Reservation, on_delete=models.CASCADE, related_name='series')
+    weekdays = models.PositiveSmallIntegerField()
+    start_date = models.DateField()
+    end_date = models.DateField(db_index=True)
+    exceptions = models.JSONField(default=list, blank=True)
+
+    objects = ReservationSeriesQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.reservation_id}: {self.start_date} - {self.end_date}"
+
+    def exceptionDates(self):
+        return {date.fromisoformat(value) for value in self.exceptions}
+
+    def rule(self):
+        """
+        (weekdays, start, end, exceptions) tuple used by the recurrence helpers.
+        """
+        return self.weekdays, self.start_date, self.end_date, self.exceptionDates()
+
+    def occurrences(self, window_start=None, window_end=None):
+        """
+        Generator over the dates of the series, optionally inside a window.
+        """
+        return expand(*self.rule(), window_start, window_end)
+
+    def occursOn(self, date):
+        return (self.start_date <= date <= self.end_date
+                and self.weekdays >> date.weekday() & 1 == 1
+                and date.isoformat() not in self.exceptions)
+
+    def occursWeekly(self, day_index, since):
+        """
+        Whether the series occurs at least once on that weekday on or after ``since``.
+        """
+        return firstCommonDate(self.rule(), (1 << day_index, since, date.max, ())) is not None
+
+    def firstConflict(self, room_id, hour_block):
+        """
+        First date on which the series collides with another booking of the
+        room in the same block, or None.
+
+        Weekly reservations and other series are compared with interval
+        arithmetic; dated reservations are read from the RoomWeek rows of the
+        series' weeks that have one of its slots taken.
+
+        Args:
+            room_id (int): Room of the series.
+            hour_block (str): Bloque horario (ej. "10:00-11:30")
+        """
+        hour_index = Room.HOURS[hour_block]
+        rule = self.rule()
+        conflicts = []
+
+        weekly_days = RoomSlot.objects.filter(
+            room_id=room_id, hour_index=hour_index, day_index__in=weekdayBits(self.weekdays)
+        ).values_list('day_index', flat=True)
+        conflicts += [firstCommonDate(rule, (1 << day_index, date.min, date.max, ())) for day_index in weekly_days]
+
+        bits = sum(1 << slotCode(day_index, hour_index) for day_index in weekdayBits(self.weekdays))
+        weeks = RoomWeek.objects.filter(
+            room_id=room_id, week_start__gte=Room.weekStart(self.start_date), week_start__lte=self.end_date
+        ).exclude(Exact(F('availability_mask').bitand(bits), 0)).values_list('week_start', 'availability_mask')
+        for week_start, mask in weeks:
+            conflicts += [
+                day for day in expand(mask >> (hour_index * len(Room.DAYS)) & self.weekdays,
+                                      week_start, week_start + WEEK - timedelta(days=1))
+                if self.occursOn(day)
+            ]
+
+        others = ReservationSeries.objects.overlapping(
+            room_id, self.start_date, self.end_date, hour_block
+        ).exclude(Exact(F('weekdays').bitand(self.weekdays), 0))
+        if self.pk:
+            others = others.exclude(pk=self.pk)
+        conflicts += [firstCommonDate(rule, other.rule()) for other in others]
+
+        conflicts = [day for day in conflicts if day is not None]
+        return min(conflicts) if conflicts else None
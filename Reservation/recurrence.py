@@ -0,0 +1,111 @@
+import heapq
+from datetime import timedelta
+from Room.models import Room
+
+WEEK = timedelta(days=7)
+
+
+def weekdayBits(weekdays):
+    """
+    Indexes (Room.DAYS) of the days set in a weekday mask, in order.
+    """
+    return [day_index for day_index in range(len(Room.DAYS)) if weekdays >> day_index & 1]
+
+
+def firstOnOrAfter(date, day_index):
+    """
+    First date on or after ``date`` falling on the given weekday.
+    """
+    return date + timedelta(days=(day_index - date.weekday()) % 7)
+
+
+def expand(weekdays, start, end, exceptions=(), window_start=None, window_end=None):
+    """
+    Lazily yield the dates of a weekly rule, in order.
+
+    Args:
+        weekdays (int): Weekday mask (bit ``Room.DAYS`` index).
+        start, end (date): Range of the rule (inclusive).
+        exceptions (set): Dates skipped by the rule.
+        window_start, window_end (date): Optional window to restrict the expansion to.
+
+    Yields:
+        date: Each occurrence between the rule range and the window.
+    """
+    lo = max(start, window_start) if window_start else start
+    hi = min(end, window_end) if window_end else end
+    days = weekdayBits(weekdays)
+    if lo > hi or not days:
+        return
+    week = Room.weekStart(lo)
+    while week <= hi:
+        for day_index in days:
+            date = week + timedelta(days=day_index)
+            if lo <= date <= hi and date not in exceptions:
+                yield date
+        week += WEEK
+
+
+def firstCommonDate(a, b):
+    """
+    First date on which two weekly rules both occur, or None.
+
+    Each rule is a (weekdays, start, end, exceptions) tuple. Resolved by
+    interval arithmetic: only the overlap of both ranges and their common
+    weekdays are considered, and each weekday steps over the exceptions
+    only, so the cost does not depend on the length of the series.
+    """
+    lo = max(a[1], b[1])
+    hi = min(a[2], b[2])
+    common = a[0] & b[0]
+    if lo > hi or not common:
+        return None
+
+    skipped = set(a[3]) | set(b[3])
+    first = None
+    for day_index in weekdayBits(common):
+        date = firstOnOrAfter(lo, day_index)
+        while date in skipped:
+            date += WEEK
+        if date <= hi and (first is None or date < first):
+            first = date
+    return first
+
+
+def bookingsBetween(room_id, start, end):
+    """
+    Lazily yield every booking of a room between two dates (inclusive), in
+    calendar order: dated reservations come from the (room, reserved_date,
+    reserved_hour_block) index and series are expanded on the fly.
+
+    Yields:
+        dict: id, reserved_date, reserved_day, reserved_hour_block, state, user_id and series.
+    """
+    from .models import Reservation, ReservationSeries
+
+    days = list(Room.DAYS)
+    dated = (
+        dict(booking, series=False)
+        for booking in Reservation.objects.for_room_between(room_id, start, end).values(
+            'id', 'reserved_date', 'reserved_day', 'reserved_hour_block', 'state', 'user_id'
+        ).iterator()
+    )
+    expanded = [
+        (
+            {
+                'id': series.reservation_id,
+                'reserved_date': date,
+                'reserved_day': days[date.weekday()],
+                'reserved_hour_block': series.reservation.reserved_hour_block,
+                'state': series.reservation.state,
+                'user_id': series.reservation.user_id,
+                'series': True,
+            }
+            for date in series.occurrences(start, end)
+        )
+        for series in ReservationSeries.objects.overlapping(room_id, start, end).select_related('reservation')
+    ]
+    return heapq.merge(
+        dated, *expanded,
+        key=lambda booking: (booking['reserved_date'], booking['reserved_hour_block'])
+    )
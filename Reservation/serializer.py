@@ -1,11 +1,18 @@
 from rest_framework import serializers
-from .models import Reservation, ReservationXElements
+from django.db import transaction
+from Exceptions.customException import customException
+from .models import Reservation, ReservationSeries, ReservationXElements
+from .inventory import ElementLedger
+from RecreativeElement.models import RecreativeElement
 from RecreativeElement.serializers import RecreativeElementSerializer
+from Room.models import Room
 from Room.serializer import RoomReadSerializer
+from Room.slots import canonicalDay, canonicalHour, dayIndex
+from config.fields import SparseFieldsMixin
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email']
@@ -19,22 +26,67 @@ class ReservationXElementsSerializer(serializers.ModelSerializer):
         fields = ['element', 'amount', 'element_details']
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class WeekdaysField(serializers.Field):
+    """
+    Weekday mask exposed as a list of day names (ej. ["Lunes", "Miércoles"]).
+    Días are also accepted as ISO weekday numbers or without accents.
+    """
+    def to_representation(self, value):
+        return [day for day, day_index in Room.DAYS.items() if value >> day_index & 1]
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError("Se requiere una lista de días.")
+        invalid = [day for day in data if dayIndex(day) is None]
+        if invalid:
+            raise serializers.ValidationError(f"Los días {invalid} no son válidos.")
+        return sum({1 << dayIndex(day) for day in data})
+
+
+class ReservationSeriesSerializer(serializers.ModelSerializer):
+    weekdays = WeekdaysField()
+    exceptions = serializers.ListField(child=serializers.DateField(), required=False)
+
+    class Meta:
+        model = ReservationSeries
+        fields = ['weekdays', 'start_date', 'end_date', 'exceptions']
+
+    def validate(self, attrs):
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({'end_date': ["La fecha final es anterior a la inicial."]})
+        exceptions = sorted(set(attrs.get('exceptions', [])))
+        outside = [day for day in exceptions if not attrs['start_date'] <= day <= attrs['end_date']]
+        if outside:
+            raise serializers.ValidationError({'exceptions': [f"Las fechas {outside} están fuera de la serie."]})
+        attrs['exceptions'] = [day.isoformat() for day in exceptions]
+        return attrs
+
+
+class ReservationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     room_details = RoomReadSerializer(source='room', read_only=True)
     borrowed_elements = ReservationXElementsSerializer(source='reservationxelements_set', many=True, read_only=True)
+    recurrence = serializers.SerializerMethodField()
     
     class Meta:
         model = Reservation
         fields = [
             'id', 'location', 'state',
-            'reserved_day', 'reserved_hour_block',
+            'reserved_day', 'reserved_hour_block', 'reserved_date',
             'user', 'user_details',
             'room', 'room_details',
             'register', 
-            'borrowed_elements'
+            'borrowed_elements', 'recurrence'
         ]
         read_only_fields = ['user_details', 'room_details', 'borrowed_elements']
+        # Nested objects skipped (with their joins) when ?expand= does not list them
+        expandable = ['user_details', 'room_details', 'borrowed_elements', 'recurrence']
+
+    def get_recurrence(self, obj):
+        try:
+            return ReservationSeriesSerializer(obj.series).data
+        except ReservationSeries.DoesNotExist:
+            return None
 
 
 
@@ -46,27 +98,245 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
         ),
         required=False, write_only=True
     )
+    recurrence = ReservationSeriesSerializer(required=False, write_only=True)
     
     class Meta:
         model = Reservation
         fields = [
             'id', 'location', 'state',
-            'reserved_day', 'reserved_hour_block',
-            'user', 'room', 'register', 'borrowed_elements'
+            'reserved_day', 'reserved_hour_block', 'reserved_date',
+            'user', 'room', 'register', 'borrowed_elements', 'recurrence'
         ]
+
+    def validate(self, attrs):
+        """
+        A dated reservation takes its reserved_day from the date (the stored
+        one on updates that do not send a date); a series has no single day
+        or date.
+        """
+        has_series = 'recurrence' in attrs or (self.instance is not None and hasattr(self.instance, 'series'))
+        if has_series:
+            return self._validate_series(attrs)
+        if 'reserved_date' in attrs or self.instance is None:
+            reserved_date = attrs.get('reserved_date')
+        else:
+            reserved_date = self.instance.reserved_date
+        if reserved_date is None:
+            return attrs
+        days = list(Room.DAYS)
+        if reserved_date.weekday() >= len(days):
+            raise serializers.ValidationError({'reserved_date': ["No se puede reservar en domingo."]})
+        reserved_day = days[reserved_date.weekday()]
+        if attrs.get('reserved_day') not in (None, reserved_day):
+            raise serializers.ValidationError(
+                {'reserved_day': [f"La fecha {reserved_date} corresponde a {reserved_day}."]}
+            )
+        attrs['reserved_day'] = reserved_day
+        return attrs
+
+    def validate_reserved_day(self, value):
+        """
+        Accept ISO weekday numbers and unaccented names (ej. "3", "miercoles");
+        unknown values are left for the slot validation of the view.
+        """
+        return canonicalDay(value) or value
+
+    def validate_reserved_hour_block(self, value):
+        """
+        Accept the block's start time or zero-padded form (ej. "07:00", "07:00-08:30").
+        """
+        return canonicalHour(value) or value
+
+    def _validate_series(self, attrs):
+        def current(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+
+        errors = {}
+        if not current('room'):
+            errors['room'] = ["Una serie requiere una sala."]
+        if current('reserved_hour_block') not in Room.HOURS:
+            errors['reserved_hour_block'] = ["El bloque horario no es válido."]
+        if attrs.get('reserved_date') or attrs.get('reserved_day'):
+            errors['recurrence'] = ["Una serie no puede tener día ni fecha fijos."]
+        if attrs.get('borrowed_elements'):
+            errors['borrowed_elements'] = ["Las series no pueden incluir elementos prestados."]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
     
+    def validate_borrowed_elements(self, value):
+        """
+        Check every element id with a single query and normalize the items.
+
+        The set of existing ids can be supplied in ``context['element_ids']``
+        (bulk creation resolves it once for the whole batch).
+        """
+        elements = {}
+        for element_data in value:
+            element_id = element_data.get('element')
+            if not element_id:
+                continue
+            if element_id in elements:
+                raise serializers.ValidationError(f"El elemento {element_id} está repetido.")
+            amount = element_data.get('amount', 1)
+            if amount < 1:
+                raise serializers.ValidationError(f"La cantidad del elemento {element_id} debe ser al menos 1.")
+            elements[element_id] = amount
+
+        known_ids = self.context.get('element_ids')
+        if known_ids is None:
+            known_ids = RecreativeElement.objects.only('id').in_bulk(list(elements))
+        missing = [element_id for element_id in elements if element_id not in known_ids]
+        if missing:
+            raise serializers.ValidationError(f"Los elementos {missing} no existen.")
+
+        return [{'element': element_id, 'amount': amount} for element_id, amount in elements.items()]
+
+    def _allocate_elements(self, amounts, day, hour_block, state, exclude_reservation_id=None):
+        """
+        Lock the requested elements and check they have enough free units at the slot.
+
+        Raises:
+            ValidationError: Si no hay unidades suficientes en el horario
+        """
+        if not amounts or state in Reservation.INACTIVE_STATES:
+            return
+        ledger = ElementLedger(amounts, {(day, hour_block)}, exclude_reservation_id)
+        try:
+            ledger.allocate(day, hour_block, amounts)
+        except customException as e:
+            raise serializers.ValidationError({'borrowed_elements': [str(e)]})
+
+    @transaction.atomic(savepoint=False)
     def create(self, validated_data):
+        recurrence = validated_data.pop('recurrence', None)
         borrowed_elements_data = validated_data.pop('borrowed_elements', [])
+        self._allocate_elements(
+            {element_data['element']: element_data['amount'] for element_data in borrowed_elements_data},
+            validated_data.get('reserved_day'), validated_data.get('reserved_hour_block'),
+            validated_data.get('state')
+        )
         reservation = Reservation.objects.create(**validated_data)
-        
-        for element_data in borrowed_elements_data:
-            element_id = element_data.get('element')
-            amount = element_data.get('amount', 1)
-            if element_id:
-                ReservationXElements.objects.create(
-                    reservation=reservation,
-                    element_id=element_id,
-                    amount=amount
-                )
-        
+        if recurrence is not None:
+            ReservationSeries.objects.create(reservation=reservation, **recurrence)
+        else:
+            # Known to have no series: spare the response a lookup
+            Reservation.series.related.set_cached_value(reservation, None)
+
+        ReservationXElements.objects.bulk_create([
+            ReservationXElements(
+                reservation=reservation,
+                element_id=element_data['element'],
+                amount=element_data['amount']
+            )
+            for element_data in borrowed_elements_data
+        ])
+
+        return reservation
+
+    @transaction.atomic(savepoint=False)
+    def update(self, instance, validated_data):
+        """
+        Write only the submitted fields, and check element stock only when
+        the elements, the slot or the state change.
+        """
+        recurrence = validated_data.pop('recurrence', None)
+        borrowed_elements_data = validated_data.pop('borrowed_elements', None)
+        slot_changed = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in ('reserved_day', 'reserved_hour_block', 'reserved_date', 'state')
+        )
+        if borrowed_elements_data is not None or slot_changed:
+            if borrowed_elements_data is not None:
+                amounts = {element_data['element']: element_data['amount'] for element_data in borrowed_elements_data}
+            else:
+                amounts = dict(instance.reservationxelements_set.values_list('element_id', 'amount'))
+            self._allocate_elements(
+                amounts,
+                validated_data.get('reserved_day', instance.reserved_day),
+                validated_data.get('reserved_hour_block', instance.reserved_hour_block),
+                validated_data.get('state', instance.state),
+                exclude_reservation_id=instance.id
+            )
+
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        reservation = instance
+        if recurrence is not None:
+            ReservationSeries.objects.update_or_create(reservation=reservation, defaults=recurrence)
+
+        if borrowed_elements_data is not None:
+            self._update_borrowed_elements(reservation, borrowed_elements_data)
+
         return reservation
+
+    def _update_borrowed_elements(self, reservation, borrowed_elements_data):
+        """
+        Write only the borrowed elements that changed: insert new ones, update
+        changed amounts and delete the ones no longer requested.
+        """
+        current = {item.element_id: item for item in reservation.reservationxelements_set.all()}
+        received = {element_data['element']: element_data['amount'] for element_data in borrowed_elements_data}
+
+        to_create = [
+            ReservationXElements(reservation=reservation, element_id=element_id, amount=amount)
+            for element_id, amount in received.items() if element_id not in current
+        ]
+        to_update = []
+        for element_id, amount in received.items():
+            item = current.get(element_id)
+            if item is not None and item.amount != amount:
+                item.amount = amount
+                to_update.append(item)
+        to_delete = [item.id for element_id, item in current.items() if element_id not in received]
+
+        if to_delete:
+            ReservationXElements.objects.filter(id__in=to_delete).delete()
+        if to_update:
+            ReservationXElements.objects.bulk_update(to_update, ['amount'])
+        if to_create:
+            ReservationXElements.objects.bulk_create(to_create)
+
+
+class RoomNeedSerializer(serializers.Serializer):
+    """
+    One need of an automatic room assignment: a group size, the elements the
+    room must have and a weekly (reserved_day) or dated (reserved_date) slot.
+    """
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    state = serializers.CharField(max_length=150, required=False, default="Confirmada")
+    capacity = serializers.IntegerField(min_value=1, required=False, default=1)
+    elements = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    reserved_day = serializers.CharField(required=False)
+    reserved_date = serializers.DateField(required=False)
+    reserved_hour_block = serializers.CharField()
+
+    def validate_reserved_day(self, value):
+        day = canonicalDay(value)
+        if day is None:
+            raise serializers.ValidationError(f'"{value}" no es un día válido.')
+        return day
+
+    def validate_reserved_hour_block(self, value):
+        hour_block = canonicalHour(value)
+        if hour_block is None:
+            raise serializers.ValidationError(f'"{value}" no es un bloque horario válido.')
+        return hour_block
+
+    def validate(self, attrs):
+        reserved_date = attrs.get('reserved_date')
+        if reserved_date is None:
+            if 'reserved_day' not in attrs:
+                raise serializers.ValidationError({'reserved_day': ["Se requiere un día o una fecha."]})
+            day_index = Room.DAYS[attrs['reserved_day']]
+        else:
+            day_index = reserved_date.weekday()
+            if day_index >= len(Room.DAYS):
+                raise serializers.ValidationError({'reserved_date': ["No se puede reservar en domingo."]})
+        attrs['day_index'] = day_index
+        attrs['hour_index'] = Room.HOURS[attrs['reserved_hour_block']]
+        attrs['element_ids'] = set(attrs['elements'])
+        attrs.setdefault('reserved_date', None)
+        return attrs
+
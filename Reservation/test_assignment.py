@@ -0,0 +1,105 @@
+import subprocess
+import sys
+from pathlib import Path
+from datetime import date, timedelta
+from unittest.mock import patch
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from Reservation import matching
+from Reservation.matching import PARALLEL_GROUPS, matchGroup, solveGroups
+from Reservation.models import Reservation
+from RecreativeElement.models import RecreativeElement
+from Room.models import Room, RoomXElements
+from User.models import User
+
+
+class TestMatchGroup(SimpleTestCase):
+    def test_augmenting_paths_fulfil_more_needs_than_greedy(self):
+        # Greedy best fit gives need 0 room 1, which need 1 also needs
+        self.assertEqual(matchGroup({0: [1, 2], 1: [1], 2: [2, 3]}), {0: 2, 1: 1, 2: 3})
+        self.assertEqual(len(matchGroup({0: [1], 1: [1], 2: []})), 1)
+
+    def test_large_batches_are_matched_in_worker_processes(self):
+        groups = [{need: [(need + offset) % 40 for offset in range(3)] for need in range(40)}
+                  for _ in range(PARALLEL_GROUPS)]
+        with patch.object(matching, 'ProcessPoolExecutor', wraps=matching.ProcessPoolExecutor) as pool:
+            self.assertEqual(solveGroups(groups[:-1], workers=2), [matchGroup(group) for group in groups[:-1]])
+            pool.assert_not_called()
+            self.assertEqual(solveGroups(groups, workers=2), [matchGroup(group) for group in groups])
+            pool.assert_called_once_with(max_workers=2)
+
+    def test_matching_loads_without_django(self):
+        # Spawned workers import the module before any Django setup
+        subprocess.run([sys.executable, "-c", "import Reservation.matching, sys; "
+                        "assert not any(name.startswith('django') for name in sys.modules)"],
+                       cwd=Path(__file__).resolve().parent.parent, check=True)
+
+
+class TestAssignRooms(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="8000", username="coordinador", idNum="8000", name="Coordinador",
+            email="coordinador@mail.escuelaing.edu.co", role="ADMIN"
+        )
+        self.projector = RecreativeElement.objects.create(name="Proyector", quantity=2)
+        self.small = Room.objects.create(location="Sala pequeña", capacity=10, description="")
+        self.medium = Room.objects.create(location="Sala mediana", capacity=30, description="")
+        self.large = Room.objects.create(location="Auditorio", capacity=100, description="")
+        RoomXElements.objects.create(room=self.large, element=self.projector, amount=1)
+
+    def _need(self, capacity, elements=(), **slot):
+        return dict({"user": self.user.id, "capacity": capacity, "elements": list(elements),
+                     "reserved_hour_block": "10:00-11:30"}, **slot)
+
+    def test_plan_prefers_best_fitting_rooms(self):
+        response = self.client.post('/reservation/assign/', {"requests": [
+            self._need(30, [self.projector.id], reserved_day="Martes"),
+            self._need(5, reserved_day="Martes"),
+            self._need(20, reserved_day="Martes"),
+            self._need(20, reserved_day="Martes"),
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['room'] for result in response.data['results']],
+                         [self.large.id, self.small.id, self.medium.id, None])
+        self.assertEqual(response.data['unassigned'], 1)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_booked_slots_are_skipped(self):
+        self.medium.reserveRoom("Martes", "10:00-11:30")
+        self.large.reserveRoomOn(date(2030, 3, 5), "10:00-11:30")
+        response = self.client.post('/reservation/assign/', {"requests": [
+            self._need(20, reserved_day="Martes"),
+            self._need(20, reserved_date="2030-03-05"),
+            self._need(20, reserved_date="2030-03-12"),
+        ]}, format='json')
+        # A weekly Tuesday booking of the auditorium would clash with its dated one
+        self.assertEqual([result['room'] for result in response.data['results']],
+                         [None, None, self.large.id])
+
+    def test_commit_creates_the_plan_atomically(self):
+        response = self.client.post('/reservation/assign/', {"commit": True, "requests": [
+            self._need(8, reserved_date="2030-03-05"),
+            self._need(8, reserved_date="2030-03-05"),
+            self._need(8, reserved_day="Domingo"),
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result['status'] for result in response.data['results']], ["created", "created", "error"])
+        self.assertEqual(
+            sorted(Reservation.objects.values_list('room_id', flat=True)), [self.small.id, self.medium.id]
+        )
+        again = self.client.post('/reservation/', {
+            "location": "Sala pequeña", "state": "Confirmada", "user": self.user.id, "room": self.small.id,
+            "reserved_date": "2030-03-05", "reserved_hour_block": "10:00-11:30"
+        }, format='json')
+        self.assertEqual(again.status_code, 400)
+
+    def test_large_batches_use_the_pool(self):
+        days = [date(2030, 3, 1) + timedelta(days=offset) for offset in range(60)]
+        needs = [self._need(5, reserved_date=day.isoformat()) for day in days if day.weekday() < 6]
+        sequential = self.client.post('/reservation/assign/', {"requests": needs, "workers": 1}, format='json')
+        pooled = self.client.post('/reservation/assign/', {"requests": needs, "workers": 4}, format='json')
+        self.assertEqual(sequential.data, pooled.data)
+        self.assertEqual(pooled.data['unassigned'], 0)
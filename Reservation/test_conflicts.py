@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from django.test import TestCase
+from rest_framework.test import APIClient
+from Reservation.conflicts import ConflictDetector, slotNumber
+from Reservation.models import Reservation, ReservationSeries
+from Room.models import Room
+from User.models import User
+
+TODAY = date(2030, 3, 1)
+
+
+class TestConflictDetector(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            id="7000", username="conflictos", idNum="7000", name="Conflictos",
+            email="conflictos@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala C", capacity=10, description="")
+        self.room.reserveRoom("Martes", "7:00-8:30")
+        self.room.reserveRoomOn(date(2030, 3, 6), "10:00-11:30")
+        reservation = Reservation.objects.create(
+            location="Sala C", state="Confirmada", user=self.user, room=self.room, reserved_hour_block="8:30-10:00"
+        )
+        ReservationSeries.objects.create(
+            reservation=reservation, weekdays=1 << 4, start_date=date(2030, 3, 1), end_date=date(2030, 4, 30)
+        )
+
+    def _load(self):
+        with self.assertNumQueries(3):
+            return ConflictDetector.load([self.room.id], date(2030, 3, 1), date(2030, 3, 31), today=TODAY)
+
+    def test_dated_weekly_and_series_bookings_conflict(self):
+        detector = self._load()
+        self.assertTrue(detector.conflictsOn(self.room.id, date(2030, 3, 12), 0))   # weekly Tuesday
+        self.assertTrue(detector.conflictsOn(self.room.id, date(2030, 3, 6), 2))    # dated
+        self.assertTrue(detector.conflictsOn(self.room.id, date(2030, 3, 15), 1))   # series Friday
+        self.assertFalse(detector.conflictsOn(self.room.id, date(2030, 3, 13), 2))
+        self.assertFalse(detector.conflictsOn(self.room.id, date(2030, 3, 15), 2))
+
+    def test_ranges_across_blocks(self):
+        detector = self._load()
+        wednesday = slotNumber(date(2030, 3, 6), 0)
+        self.assertTrue(detector.conflicts(self.room.id, wednesday, wednesday + 3))
+        self.assertFalse(detector.conflicts(self.room.id, wednesday, wednesday + 2))
+        self.assertFalse(detector.conflicts(self.room.id, wednesday + 3, wednesday + 8))
+
+    def test_weekly_proposals(self):
+        detector = self._load()
+        self.assertTrue(detector.conflictsWeekly(self.room.id, 1, 0))
+        self.assertTrue(detector.conflictsWeekly(self.room.id, 2, 2))
+        self.assertTrue(detector.conflictsWeekly(self.room.id, 4, 1))
+        self.assertFalse(detector.conflictsWeekly(self.room.id, 3, 3))
+
+    def test_batch_books_accepted_proposals(self):
+        detector = self._load()
+        thursday = slotNumber(date(2030, 3, 7), 0)
+        self.assertEqual(
+            detector.validate([
+                (self.room.id, thursday, thursday + 2),
+                (self.room.id, thursday + 1, thursday + 3),
+                (self.room.id, thursday + 2, thursday + 3),
+            ]),
+            [True, False, True]
+        )
+        self.assertEqual(detector.booked[self.room.id], set(range(thursday, thursday + 3)))
+        self.assertTrue(detector.conflicts(self.room.id, thursday + 2, thursday + 4))
+
+    def test_thousands_of_proposals_in_memory(self):
+        with self.assertNumQueries(3):
+            detector = ConflictDetector.load([self.room.id], date(2030, 3, 1), date(2031, 12, 31), today=TODAY)
+        start = slotNumber(date(2030, 3, 1), 0)
+        proposals = [(self.room.id, number, number + 1) for number in range(start, start + 5000)]
+        with self.assertNumQueries(0):
+            accepted = detector.validate(proposals)
+
+        days = [date(2030, 3, 1) + timedelta(days=offset) for offset in range(5000 // 8)]
+        tuesdays = sum(1 for day in days if day.weekday() == 1)
+        series_fridays = sum(1 for day in days if day.weekday() == 4 and day <= date(2030, 4, 30))
+        self.assertEqual(accepted.count(False), tuesdays + series_fridays + 1)
+
+
+class TestBulkConflicts(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="7100", username="lote", idNum="7100", name="Lote",
+            email="lote@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala L", capacity=10, description="")
+
+    def test_batch_mixes_dated_and_weekly_bookings(self):
+        next_monday = Room.weekStart(date.today()) + timedelta(days=7)
+        base = {"location": "Sala L", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+                "reserved_hour_block": "7:00-8:30"}
+        response = self.client.post('/reservation/bulk/', [
+            dict(base, reserved_date=next_monday.isoformat()),
+            dict(base, reserved_date=(next_monday + timedelta(days=7)).isoformat()),
+            dict(base, reserved_day="Lunes"),
+            dict(base, reserved_day="Martes"),
+            dict(base, reserved_date=(next_monday + timedelta(days=15)).isoformat()),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ["created", "created", "error", "created", "error"]
+        )
@@ -0,0 +1,76 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from Reservation.models import Reservation, ReservationXElements
+from Room.models import Room
+from RecreativeElement.models import RecreativeElement
+from Register.models import Register
+from User.models import User
+
+
+class TestElementInventory(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="5000", username="estudiante5", idNum="5000", name="Estudiante",
+            email="estudiante5@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.ball = RecreativeElement.objects.create(name="Balón", quantity=3)
+        self.room = Room.objects.create(location="Coliseo", capacity=30, description="")
+        self.other_room = Room.objects.create(location="Cancha", capacity=30, description="")
+
+    def _post(self, room, day, hour_block, amount, state="Confirmada"):
+        return self.client.post('/reservation/', {
+            "location": room.location, "state": state, "user": self.user.id,
+            "room": room.id, "reserved_day": day, "reserved_hour_block": hour_block,
+            "borrowed_elements": [{"element": self.ball.id, "amount": amount}]
+        }, format='json')
+
+    def _units_free(self, day, hour_block):
+        response = self.client.get('/recreative-elements/availability/',
+                                   {'day': day, 'hour_block': hour_block})
+        return response.data['results'][0]['units_free']
+
+    def test_over_allocation_is_rejected_per_slot(self):
+        self.assertEqual(self._post(self.room, "Lunes", "7:00-8:30", 2).status_code, 201)
+        self.assertEqual(self._units_free("Lunes", "7:00-8:30"), 1)
+
+        response = self._post(self.other_room, "Lunes", "7:00-8:30", 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('borrowed_elements', response.data)
+        # The room slot reserved before the stock check is rolled back
+        self.assertTrue(Room.objects.get(id=self.other_room.id).is_available("Lunes", "7:00-8:30"))
+
+        self.assertEqual(self._post(self.other_room, "Martes", "7:00-8:30", 3).status_code, 201)
+
+    def test_slot_aliases_are_normalized(self):
+        response = self._post(self.room, "1", "07:00", 2)
+        self.assertEqual(response.status_code, 201)
+        reservation = Reservation.objects.get(id=response.data['id'])
+        self.assertEqual((reservation.reserved_day, reservation.reserved_hour_block), ("Lunes", "7:00-8:30"))
+        self.assertEqual(reservation.slot_code, 0)
+        # Units lent under the alias are counted in the canonical slot
+        self.assertEqual(self._units_free("Lunes", "7:00-8:30"), 1)
+        self.assertEqual(self._post(self.other_room, "lunes", "7:00-8:30", 2).status_code, 400)
+
+    def test_unreturned_units_are_subtracted(self):
+        reservation = Reservation.objects.create(
+            location=self.room.location, state="Terminada", user=self.user, room=self.room,
+            reserved_day="Viernes", reserved_hour_block="7:00-8:30"
+        )
+        register = Register.objects.create(
+            reservationId=reservation,
+            remainingElements=[{'codigo': str(self.ball.id), 'nombre': "Balón", 'estado': "NOT_RETURNED", 'cantidad': 1}]
+        )
+        self.assertEqual(self._units_free("Jueves", "10:00-11:30"), 2)
+
+        register.remainingElements = []
+        register.save()
+        self.assertEqual(self._units_free("Jueves", "10:00-11:30"), 3)
+
+    def test_inactive_reservations_do_not_hold_units(self):
+        reservation = Reservation.objects.create(
+            location=self.room.location, state="Cancelada", user=self.user, room=self.room,
+            reserved_day="Lunes", reserved_hour_block="8:30-10:00"
+        )
+        ReservationXElements.objects.create(reservation=reservation, element=self.ball, amount=3)
+        self.assertEqual(self._units_free("Lunes", "8:30-10:00"), 3)
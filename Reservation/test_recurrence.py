@@ -0,0 +1,163 @@
+from datetime import date
+from django.test import TestCase
+from rest_framework.test import APIClient
+from Reservation.models import Reservation, ReservationSeries
+from Reservation.recurrence import expand, firstCommonDate
+from Room.models import Room
+from User.models import User
+
+MONDAY, WEDNESDAY, FRIDAY = 1 << 0, 1 << 2, 1 << 4
+
+
+class TestRecurrenceRules(TestCase):
+    def test_expand_is_lazy_and_skips_exceptions(self):
+        dates = expand(MONDAY | WEDNESDAY, date(2030, 3, 1), date(2030, 3, 31), {date(2030, 3, 6)})
+        self.assertEqual(next(dates), date(2030, 3, 4))
+        self.assertEqual(next(dates), date(2030, 3, 11))
+        self.assertEqual(len(list(expand(MONDAY, date(2030, 1, 1), date(2030, 12, 31),
+                                          window_start=date(2030, 3, 1), window_end=date(2030, 3, 31)))), 4)
+
+    def test_first_common_date_uses_overlap_and_exceptions(self):
+        semester = (MONDAY | WEDNESDAY, date(2030, 2, 1), date(2030, 6, 1), set())
+        self.assertEqual(
+            firstCommonDate(semester, (WEDNESDAY | FRIDAY, date(2030, 3, 1), date(2030, 3, 31), {date(2030, 3, 6)})),
+            date(2030, 3, 13)
+        )
+        self.assertIsNone(firstCommonDate(semester, (FRIDAY, date(2030, 1, 1), date(2030, 12, 31), set())))
+        self.assertIsNone(firstCommonDate(semester, (MONDAY, date(2030, 7, 1), date(2030, 12, 31), set())))
+        # Ten years of one weekday cost no more than a single week
+        self.assertEqual(
+            firstCommonDate((MONDAY, date(2030, 1, 1), date(2040, 1, 1), set()),
+                            (MONDAY, date(2039, 12, 20), date(2045, 1, 1), set())),
+            date(2039, 12, 26)
+        )
+
+
+class TestReservationSeries(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="6000", username="semestre", idNum="6000", name="Semestre",
+            email="semestre@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala S", capacity=10, description="")
+
+    def _series(self, weekdays, start, end, exceptions=(), hour_block="7:00-8:30"):
+        return self.client.post('/reservation/', {
+            "location": "Sala S", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_hour_block": hour_block,
+            "recurrence": {"weekdays": weekdays, "start_date": start, "end_date": end, "exceptions": list(exceptions)}
+        }, format='json')
+
+    def _dated(self, reserved_date, hour_block="7:00-8:30"):
+        return self.client.post('/reservation/', {
+            "location": "Sala S", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_date": reserved_date, "reserved_hour_block": hour_block
+        }, format='json')
+
+    def test_series_is_stored_as_one_row(self):
+        response = self._series(["Lunes", "Miércoles"], "2030-02-01", "2030-06-01", ["2030-03-04"])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['recurrence']['weekdays'], ["Lunes", "Miércoles"])
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(ReservationSeries.objects.get().weekdays, MONDAY | WEDNESDAY)
+
+    def test_overlapping_series_are_rejected_at_first_common_date(self):
+        self._series(["Lunes", "Miércoles"], "2030-02-01", "2030-06-01")
+        response = self._series(["Miércoles"], "2030-03-01", "2030-12-01")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2030-03-06", response.data['detail'])
+        self.assertEqual(self._series(["Martes"], "2030-03-01", "2030-12-01").status_code, 201)
+        self.assertEqual(self._series(["Lunes"], "2030-03-01", "2030-12-01", hour_block="8:30-10:00").status_code, 201)
+
+    def test_series_and_dated_reservations_block_each_other(self):
+        self._series(["Lunes"], "2030-02-01", "2030-06-01", ["2030-03-04"])
+        self.assertEqual(self._dated("2030-03-11").status_code, 400)
+        self.assertEqual(self._dated("2030-03-04").status_code, 201)
+
+        self.assertEqual(self._dated("2030-07-03").status_code, 201)
+        response = self._series(["Miércoles"], "2030-06-01", "2030-08-01")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2030-07-03", response.data['detail'])
+
+    def test_series_and_weekly_reservations_block_each_other(self):
+        self.room.reserveRoom("Viernes", "7:00-8:30")
+        self.assertEqual(self._series(["Viernes"], "2030-02-01", "2030-06-01").status_code, 400)
+
+        self.assertEqual(self._series(["Jueves"], "2030-02-01", "2099-06-01").status_code, 201)
+        response = self.client.post('/reservation/', {
+            "location": "Sala S", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_day": "Jueves", "reserved_hour_block": "7:00-8:30"
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_range_query_and_week_availability_expand_the_series(self):
+        self._series(["Lunes", "Miércoles"], "2030-02-01", "2030-06-01", ["2030-03-06"])
+        self._dated("2030-03-05")
+
+        response = self.client.get(f'/room/{self.room.id}/reservas/', {'start': "2030-03-01", 'end': "2030-03-12"})
+        self.assertEqual(
+            [(str(reserva['reserved_date']), reserva['series']) for reserva in response.data['reservas']],
+            [("2030-03-04", True), ("2030-03-05", False), ("2030-03-11", True)]
+        )
+
+        availability = self.client.get(f'/room/{self.room.id}/disponibilidad/', {'week': "2030-03-11"}).data['availability']
+        self.assertEqual(availability[0][:3], [1, 0, 1])
+
+    def test_deleting_the_series_frees_every_occurrence(self):
+        reservation_id = self._series(["Lunes"], "2030-02-01", "2030-06-01").data['id']
+        self.assertEqual(self.client.delete(f'/reservation/{reservation_id}/').status_code, 204)
+        self.assertEqual(self._dated("2030-03-11").status_code, 201)
+
+    def test_invalid_series_are_rejected(self):
+        self.assertEqual(self._series(["Domingo"], "2030-02-01", "2030-06-01").status_code, 400)
+        self.assertEqual(self._series(["Lunes"], "2030-06-01", "2030-02-01").status_code, 400)
+        self.assertEqual(self._series(["Lunes"], "2030-02-01", "2030-06-01", ["2030-07-01"]).status_code, 400)
+
+    def test_updating_the_series_checks_conflicts_without_itself(self):
+        reservation_id = self._series(["Lunes"], "2030-02-01", "2030-06-01").data['id']
+        self._dated("2030-06-05")
+        rule = {"weekdays": ["Lunes", "Miércoles"], "start_date": "2030-02-01", "end_date": "2030-06-30"}
+
+        response = self.client.patch(f'/reservation/{reservation_id}/', {"recurrence": rule}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        rule["exceptions"] = ["2030-06-05"]
+        response = self.client.patch(f'/reservation/{reservation_id}/', {"recurrence": rule}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ReservationSeries.objects.get().end_date, date(2030, 6, 30))
+
+    def test_weekly_and_dated_reservations_become_series_on_the_same_slot(self):
+        weekly = self.client.post('/reservation/', {
+            "location": "Sala S", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_day": "Lunes", "reserved_hour_block": "7:00-8:30"
+        }, format='json').data['id']
+        dated = self._dated("2030-03-05").data['id']
+        rule = {"start_date": "2030-02-01", "end_date": "2030-06-01"}
+
+        response = self.client.patch(f'/reservation/{weekly}/', {"recurrence": dict(rule, weekdays=["Lunes"])},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['reserved_day'])
+        response = self.client.patch(f'/reservation/{dated}/', {"recurrence": dict(rule, weekdays=["Martes"])},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.availability_mask, 0)
+        self.assertFalse(self.room.weeks.exclude(availability_mask=0).exists())
+        self.assertEqual(ReservationSeries.objects.count(), 2)
+
+    def test_failed_conversion_to_a_series_keeps_the_old_slot(self):
+        self._series(["Miércoles"], "2030-02-01", "2030-06-01")
+        weekly = self.client.post('/reservation/', {
+            "location": "Sala S", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_day": "Lunes", "reserved_hour_block": "7:00-8:30"
+        }, format='json').data['id']
+        rule = {"weekdays": ["Lunes", "Miércoles"], "start_date": "2030-02-01", "end_date": "2030-06-01"}
+
+        response = self.client.patch(f'/reservation/{weekly}/', {"recurrence": rule}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.room.refresh_from_db()
+        self.assertFalse(self.room.is_available("Lunes", "7:00-8:30"))
+        self.assertEqual(Reservation.objects.get(id=weekly).reserved_day, "Lunes")
@@ -0,0 +1,462 @@
+import csv
+import io
+import json
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from Reservation.models import Reservation, ReservationXElements
+from Reservation.serializer import ReservationCreateSerializer, ReservationSerializer
+from config.export import stream_export
+from Exceptions.customException import customException, exception
+from Room.models import Room, RoomXElements
+from RecreativeElement.models import RecreativeElement
+from Register.models import Register
+from User.models import User
+
+
+class TestReservationListQueries(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="1000", username="estudiante", idNum="1000", name="Estudiante",
+            email="estudiante@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.element = RecreativeElement.objects.create(name="Parqués", quantity=5)
+
+    def _create_reservations(self, count):
+        for index in range(count):
+            room = Room.objects.create(location=f"Sala {index}", capacity=10, description="")
+            RoomXElements.objects.create(room=room, element=self.element, amount=2)
+            reservation = Reservation.objects.create(
+                location=room.location, state="Confirmada", user=self.user, room=room,
+                reserved_day="Lunes", reserved_hour_block="7:00-8:30"
+            )
+            ReservationXElements.objects.create(reservation=reservation, element=self.element, amount=1)
+
+    def test_list_query_count_is_constant(self):
+        self._create_reservations(2)
+        with self.assertNumQueries(7):
+            response = self.client.get('/reservation/')
+        self.assertEqual(len(response.data['results']), 2)
+
+        self._create_reservations(8)
+        with self.assertNumQueries(7):
+            response = self.client.get('/reservation/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['borrowed_elements'][0]['element_details']['item_name'], "Parqués")
+        self.assertEqual(response.data['results'][0]['room_details']['elementos'][0]['amount'], 2)
+
+    def test_fields_narrow_the_response_and_the_query(self):
+        self._create_reservations(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/reservation/', {'fields': 'id,state'})
+        self.assertEqual(len(queries), 5)
+        self.assertNotIn('JOIN', queries[-1]['sql'])
+        self.assertNotIn('location', queries[-1]['sql'])
+        self.assertEqual(set(response.data['results'][0]), {'id', 'state'})
+
+        reservation_id = response.data['results'][0]['id']
+        response = self.client.get(f'/reservation/{reservation_id}/', {'fields': 'id,room_details.location'})
+        self.assertEqual(response.data, {'id': reservation_id, 'room_details': {'location': "Sala 0"}})
+
+        response = self.client.get('/reservation/', {'fields': 'id,recurrence,user_details.username'})
+        self.assertEqual(response.data['results'][0], {'id': reservation_id, 'recurrence': None,
+                                                       'user_details': {'username': "estudiante"}})
+
+    def test_expand_renders_only_the_listed_nested_objects(self):
+        self._create_reservations(3)
+        with self.assertNumQueries(5):
+            response = self.client.get('/reservation/', {'expand': 'room_details'})
+        result = response.data['results'][0]
+        self.assertNotIn('user_details', result)
+        self.assertNotIn('borrowed_elements', result)
+        self.assertEqual(result['state'], "Confirmada")
+        self.assertEqual(set(result['room_details']), {'id', 'location', 'capacity', 'description'})
+
+        with self.assertNumQueries(7):
+            response = self.client.get('/reservation/', {'expand': 'borrowed_elements,room_details.elementos'})
+        result = response.data['results'][0]
+        self.assertEqual(result['borrowed_elements'][0]['amount'], 1)
+        self.assertEqual(result['room_details']['elementos'][0]['amount'], 2)
+
+    def test_unchanged_list_answers_304(self):
+        self._create_reservations(2)
+        etag = self.client.get('/reservation/')['ETag']
+        self.assertEqual(self.client.get('/reservation/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        reservation = Reservation.objects.first()
+        ReservationXElements.objects.filter(reservation=reservation).get().delete()
+        self.assertEqual(self.client.get('/reservation/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class TestReservationExport(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="2000", username="docente", idNum="2000", name="Docente",
+            email="docente@mail.escuelaing.edu.co", role="TEACHER"
+        )
+        room = Room.objects.create(location="Edificio G", capacity=12, description="")
+        self.reservation = Reservation.objects.create(
+            location=room.location, state="Confirmada", user=self.user, room=room,
+            reserved_day="Jueves", reserved_hour_block="8:30-10:00"
+        )
+        Register.objects.create(reservationId=self.reservation, returnedElements={"Dominó": 1})
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_reservations_jsonl(self):
+        response = self.client.get('/reservation/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self._content(response).splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['id'], self.reservation.id)
+        self.assertEqual(row['room_details']['location'], "Edificio G")
+
+    def test_export_reservations_csv(self):
+        response = self.client.get('/reservation/export/', {'file_format': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0]['reserved_day'], "Jueves")
+        self.assertEqual(json.loads(rows[0]['user_details'])['username'], "docente")
+
+    def test_export_pages_by_primary_key(self):
+        room = Room.objects.create(location="Edificio H", capacity=12, description="")
+        for day in ("Lunes", "Martes", "Miércoles", "Viernes"):
+            Reservation.objects.create(location=room.location, state="Confirmada", user=self.user, room=room,
+                                       reserved_day=day, reserved_hour_block="7:00-8:30")
+        with self.assertNumQueries(3 * 3):
+            response = stream_export(Reservation.objects.with_details(), ReservationSerializer, 'jsonl', 'r', chunk_size=2)
+            rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], sorted(Reservation.objects.values_list('id', flat=True)))
+
+    def test_export_rejects_unknown_format(self):
+        response = self.client.get('/reservation/export/', {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_registers_jsonl(self):
+        response = self.client.get('/register/export/')
+        row = json.loads(self._content(response).splitlines()[0])
+        self.assertEqual(row['reservation_id'], self.reservation.id)
+        self.assertEqual(row['returned_elements'], {"Dominó": 1})
+
+
+class TestReservationBulkCreate(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="3000", username="coordinador", idNum="3000", name="Coordinador",
+            email="coordinador@mail.escuelaing.edu.co", role="FUNCTIONARY"
+        )
+        self.element = RecreativeElement.objects.create(name="Cartas", quantity=10)
+        self.room_a = Room.objects.create(location="Edificio A", capacity=30, description="")
+        self.room_b = Room.objects.create(location="Edificio B", capacity=30, description="")
+        self.room_b.reserveRoom("Miércoles", "7:00-8:30")
+
+    def _item(self, room, day, hour_block, **extra):
+        return {
+            "location": room.location, "state": "Confirmada", "user": self.user.id,
+            "room": room.id, "reserved_day": day, "reserved_hour_block": hour_block, **extra
+        }
+
+    def test_bulk_create_allocates_slots_and_reports_conflicts(self):
+        response = self.client.post('/reservation/bulk/', [
+            self._item(self.room_a, "Lunes", "7:00-8:30",
+                       borrowed_elements=[{"element": self.element.id, "amount": 2}]),
+            self._item(self.room_a, "Miércoles", "7:00-8:30"),
+            self._item(self.room_b, "Miércoles", "7:00-8:30"),
+            self._item(self.room_a, "Lunes", "7:00-8:30"),
+            self._item(self.room_a, "Domingo", "7:00-8:30"),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["created", "created", "error", "error", "error"])
+
+        self.room_a.refresh_from_db()
+        self.assertFalse(self.room_a.is_available("Lunes", "7:00-8:30"))
+        self.assertFalse(self.room_a.is_available("Miércoles", "7:00-8:30"))
+        self.assertEqual(self.room_a.slots.count(), 2)
+        self.assertEqual(Reservation.objects.count(), 2)
+        created = Reservation.objects.get(id=response.data["results"][0]["id"])
+        self.assertEqual(created.reservationxelements_set.get().amount, 2)
+
+    def test_bulk_create_rejects_empty_batch(self):
+        response = self.client.post('/reservation/bulk/', [], format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestReservationBorrowedElements(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            id="4000", username="admin", idNum="4000", name="Administrativo",
+            email="admin@mail.escuelaing.edu.co", role="ADMIN"
+        )
+        self.chess = RecreativeElement.objects.create(name="Ajedrez", quantity=4)
+        self.cards = RecreativeElement.objects.create(name="Cartas", quantity=4)
+        self.domino = RecreativeElement.objects.create(name="Dominó", quantity=4)
+
+    def _serializer(self, borrowed_elements, instance=None):
+        data = {"location": "Edificio A", "state": "Confirmada", "user": self.user.id,
+                "borrowed_elements": borrowed_elements}
+        return ReservationCreateSerializer(instance, data=data, partial=instance is not None)
+
+    def test_unknown_element_is_rejected(self):
+        serializer = self._serializer([{"element": self.chess.id}, {"element": 999}])
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('borrowed_elements', serializer.errors)
+
+    def test_non_positive_amount_is_rejected(self):
+        for amount in (0, -1):
+            serializer = self._serializer([{"element": self.chess.id, "amount": amount}])
+            self.assertFalse(serializer.is_valid())
+            self.assertIn('borrowed_elements', serializer.errors)
+
+    def test_create_and_update_write_only_changes(self):
+        serializer = self._serializer([{"element": self.chess.id, "amount": 1},
+                                       {"element": self.cards.id, "amount": 2}])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        reservation = serializer.save()
+        unchanged = reservation.reservationxelements_set.get(element=self.chess)
+
+        serializer = self._serializer([{"element": self.chess.id, "amount": 1},
+                                       {"element": self.domino.id, "amount": 3}], instance=reservation)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        rows = {item.element_id: item for item in reservation.reservationxelements_set.all()}
+        self.assertEqual({element_id: item.amount for element_id, item in rows.items()},
+                         {self.chess.id: 1, self.domino.id: 3})
+        self.assertEqual(rows[self.chess.id].id, unchanged.id)
+
+
+class TestReservationFilters(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="6000", username="filtros", idNum="6000", name="Filtros",
+            email="filtros@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.other_user = User.objects.create(
+            id="6001", username="otro", idNum="6001", name="Otro",
+            email="otro@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala 12", capacity=10, description="")
+        self.other_room = Room.objects.create(location="Sala 13", capacity=10, description="")
+        self.thursday = self._create(self.user, self.room, "Confirmada", "Jueves", "10:00-11:30")
+        self.cancelled = self._create(self.user, self.room, "Cancelada", "Jueves", "7:00-8:30")
+        self.dated = self._create(self.other_user, self.other_room, "Confirmada", "Martes", "7:00-8:30",
+                                  reserved_date="2030-03-05")
+
+    def _create(self, user, room, state, day, hour_block, **fields):
+        return Reservation.objects.create(
+            location=room.location, state=state, user=user, room=room,
+            reserved_day=day, reserved_hour_block=hour_block, **fields
+        )
+
+    def _ids(self, **params):
+        response = self.client.get('/reservation/', params)
+        self.assertEqual(response.status_code, 200)
+        return {reservation['id'] for reservation in response.data['results']}
+
+    def test_filters(self):
+        self.assertEqual(self._ids(user=self.user.id), {self.thursday.id, self.cancelled.id})
+        self.assertEqual(self._ids(room=self.other_room.id), {self.dated.id})
+        self.assertEqual(self._ids(state="Cancelada,Terminada"), {self.cancelled.id})
+        self.assertEqual(self._ids(day="4", active="true"), {self.thursday.id})
+        self.assertEqual(self._ids(hour_block="07:00"), {self.cancelled.id, self.dated.id})
+        self.assertEqual(self._ids(room=self.room.id, day="Jueves", hour_block="10:00-11:30"), {self.thursday.id})
+        self.assertEqual(self._ids(start="2030-03-01", end="2030-03-31"), {self.dated.id})
+        self.assertEqual(self._ids(start="2030-04-01"), set())
+
+    def test_invalid_filters_are_rejected(self):
+        for params in ({'room': 'doce'}, {'day': 'Domingo'}, {'hour_block': '7:15'}, {'start': 'ayer'}):
+            self.assertEqual(self.client.get('/reservation/', params).status_code, 400, params)
+
+    def _plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # The test tables are tiny, so make the planner prove the index is usable
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_filters_use_composite_indexes(self):
+        plan = self._plan(Reservation.objects.search(user_id=self.user.id, states=["Confirmada"]))
+        self.assertIn("reservation_user_state_idx", plan)
+        plan = self._plan(Reservation.objects.search(room_id=self.room.id, slot_codes=[21, 23]))
+        self.assertIn("reservation_room_slot_idx", plan)
+
+
+class TestDatedReservations(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="4000", username="fechas", idNum="4000", name="Fechas",
+            email="fechas@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala F", capacity=10, description="")
+
+    def _payload(self, reserved_date, hour_block="7:00-8:30"):
+        return {
+            "location": "Sala F", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_date": reserved_date, "reserved_hour_block": hour_block
+        }
+
+    def test_same_slot_can_be_booked_in_different_weeks(self):
+        first = self.client.post('/reservation/', self._payload("2030-03-04"), format='json')
+        second = self.client.post('/reservation/', self._payload("2030-03-11"), format='json')
+        repeated = self.client.post('/reservation/', self._payload("2030-03-11"), format='json')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data['reserved_day'], "Lunes")
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(repeated.status_code, 400)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.availability_mask, 0)
+
+    def test_weekly_slot_blocks_dated_booking_and_vice_versa(self):
+        self.room.reserveRoom("Martes", "8:30-10:00")
+        response = self.client.post('/reservation/', self._payload("2030-03-05", "8:30-10:00"), format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.client.post('/reservation/', self._payload("2030-03-06"), format='json').status_code, 201)
+        with self.assertRaises(customException) as context:
+            self.room.reserveRoom("Miércoles", "7:00-8:30")
+        self.assertEqual(str(context.exception), exception.ROOMALREADY_RESERVED)
+
+    def test_sunday_and_mismatched_day_are_rejected(self):
+        self.assertEqual(self.client.post('/reservation/', self._payload("2030-03-10"), format='json').status_code, 400)
+        payload = dict(self._payload("2030-03-04"), reserved_day="Martes")
+        self.assertEqual(self.client.post('/reservation/', payload, format='json').status_code, 400)
+
+    def test_update_checks_the_day_against_the_stored_date(self):
+        reservation_id = self.client.post('/reservation/', self._payload("2030-03-05"), format='json').data['id']
+        response = self.client.patch(f'/reservation/{reservation_id}/', {"reserved_day": "Viernes"}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reserved_day', response.data)
+
+        # Clearing the date turns it into a weekly reservation on that day
+        response = self.client.patch(f'/reservation/{reservation_id}/',
+                                     {"reserved_day": "Viernes", "reserved_date": None}, format='json')
+        self.assertEqual(response.status_code, 200)
+        reservation = Reservation.objects.get(id=reservation_id)
+        self.assertEqual((reservation.reserved_day, reservation.reserved_date), ("Viernes", None))
+        self.room.refresh_from_db()
+        self.assertFalse(self.room.is_available("Viernes", "7:00-8:30"))
+        self.assertEqual(self.client.post('/reservation/', self._payload("2030-03-05"), format='json').status_code, 201)
+
+    def test_destroy_releases_the_dated_slot(self):
+        reservation_id = self.client.post('/reservation/', self._payload("2030-03-04"), format='json').data['id']
+        self.assertEqual(self.client.delete(f'/reservation/{reservation_id}/').status_code, 204)
+        self.assertEqual(self.client.post('/reservation/', self._payload("2030-03-04"), format='json').status_code, 201)
+
+    def test_week_availability_and_range_query(self):
+        for reserved_date in ("2030-02-28", "2030-03-04", "2030-03-20", "2030-04-01"):
+            self.client.post('/reservation/', self._payload(reserved_date), format='json')
+
+        week = self.client.get(f'/room/{self.room.id}/disponibilidad/', {'week': "2030-03-06"})
+        self.assertEqual(week.data['availability'][0][0], 1)
+        self.assertEqual(self.client.get(f'/room/{self.room.id}/disponibilidad/').data['availability'][0][0], 0)
+
+        response = self.client.get(f'/room/{self.room.id}/reservas/', {'start': "2030-03-01", 'end': "2030-03-31"})
+        self.assertEqual(
+            [str(reserva['reserved_date']) for reserva in response.data['reservas']],
+            ["2030-03-04", "2030-03-20"]
+        )
+        missing = self.client.get('/room/abc/reservas/', {'start': "2030-03-01", 'end': "2030-03-31"})
+        self.assertEqual(missing.status_code, 404)
+
+
+class TestReservationWriteStatements(TestCase):
+    """
+    Create, update and destroy issue one conditional write per affected room,
+    a single write of the reservation and, when it becomes active or inactive,
+    one write of its user's dashboard counters.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="4100", username="escrituras", idNum="4100", name="Escrituras",
+            email="escrituras@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala W", capacity=10, description="")
+        self.other_room = Room.objects.create(location="Sala X", capacity=10, description="")
+
+    def _writes(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        writes = [query['sql'].split()[0] + " " + query['sql'].split('"')[1] for query in queries.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        return response, writes, len(queries.captured_queries)
+
+    def _create(self, **slot):
+        return self.client.post('/reservation/', dict({
+            "location": "Sala W", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+            "reserved_hour_block": "7:00-8:30"
+        }, **slot), format='json')
+
+    def test_create(self):
+        response, writes, total = self._writes(lambda: self._create(reserved_day="Lunes"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(writes, [
+            "INSERT Room_roomslot", "UPDATE Room_room", "INSERT Reservation_reservation", "UPDATE User_user",
+        ])
+        self.assertLessEqual(total, 15)
+
+    def test_create_dated_in_a_booked_week(self):
+        self._create(reserved_date="2030-03-05")
+        response, writes, _ = self._writes(lambda: self._create(reserved_date="2030-03-04"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(writes, [
+            "UPDATE Room_room", "UPDATE Room_roomweek", "INSERT Reservation_reservation", "UPDATE User_user",
+        ])
+
+    def test_conflict_writes_nothing_that_survives(self):
+        self._create(reserved_day="Lunes")
+        response, writes, _ = self._writes(lambda: self._create(reserved_day="Lunes"))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(writes, [])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_update_moves_the_slot(self):
+        reservation_id = self._create(reserved_day="Lunes").data['id']
+        response, writes, total = self._writes(
+            lambda: self.client.patch(f'/reservation/{reservation_id}/', {"room": self.other_room.id}, format='json')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(writes, [
+            "DELETE Room_roomslot", "UPDATE Room_room",
+            "INSERT Room_roomslot", "UPDATE Room_room",
+            "UPDATE Reservation_reservation",
+        ])
+        self.assertLessEqual(total, 17)
+        self.assertFalse(Room.objects.get(id=self.room.id).availability_mask)
+        self.assertTrue(Room.objects.get(id=self.other_room.id).availability_mask)
+
+    def test_update_without_slot_change_skips_the_rooms(self):
+        reservation_id = self._create(reserved_day="Lunes").data['id']
+        response, writes, _ = self._writes(
+            lambda: self.client.patch(f'/reservation/{reservation_id}/', {"state": "Terminada"}, format='json')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(writes, ["UPDATE Reservation_reservation", "UPDATE User_user"])
+
+    def test_failed_update_keeps_the_old_slot(self):
+        reservation_id = self._create(reserved_day="Lunes").data['id']
+        self.other_room.reserveRoom("Lunes", "7:00-8:30")
+        response = self.client.patch(f'/reservation/{reservation_id}/', {"room": self.other_room.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Room.objects.get(id=self.room.id).is_available("Lunes", "7:00-8:30"))
+        self.assertEqual(Reservation.objects.get(id=reservation_id).room_id, self.room.id)
+
+    def test_destroy(self):
+        reservation_id = self._create(reserved_day="Lunes").data['id']
+        response, writes, _ = self._writes(lambda: self.client.delete(f'/reservation/{reservation_id}/'))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(writes, [
+            "DELETE Room_roomslot", "UPDATE Room_room", "UPDATE User_user",
+            "DELETE Reservation_reservationxelements", "DELETE Reservation_reservationseries",
+            "DELETE Reservation_reservation",
+        ])
@@ -1,201 +1,571 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import Reservation, ReservationXElements
-from .serializer import ReservationSerializer, ReservationCreateSerializer, ReservationXElementsSerializer
+from .models import Reservation, ReservationSeries, ReservationXElements, applyBookingDelta
+from .serializer import ReservationSerializer, ReservationCreateSerializer, ReservationXElementsSerializer, RoomNeedSerializer
+from .assignment import assignRooms
+from .inventory import ElementLedger
+from .conflicts import ConflictDetector
 from Room.models import Room
-from datetime import datetime, timedelta
+from Room.slots import DAYS, HOURS, dayIndex, hourIndex, slotCode
+from RecreativeElement.models import RecreativeElement
+from datetime import date, datetime, timedelta
 from django.utils import timezone
 from Exceptions.customException import exception, customException
 from django.db import transaction
+from config.export import stream_export, EXPORT_FORMATS
+from config.conditional import collectionEtag, notModified
+from config.fields import childSelection, renderedFields, sparseSelection
+from Room.serializer import RoomReadSerializer
+from django.contrib.auth import get_user_model
 import calendar
 
 class ReservationViewSet(viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
-    
+
+    def get_queryset(self):
+        if self.action in ['list', 'retrieve']:
+            fields, expand = sparseSelection(self.request)
+            if fields is None and expand is None:
+                return Reservation.objects.with_details()
+            # ?fields= / ?expand=: load only what ReservationSerializer renders
+            rendered = renderedFields(ReservationSerializer, fields, expand)
+            room_rendered = renderedFields(RoomReadSerializer, *childSelection(fields, expand, 'room_details'))
+            return Reservation.objects.for_fields(rendered, room_rendered)
+        if self.action in ['update', 'partial_update', 'destroy']:
+            # Everything the write path and its response read, in one query
+            return super().get_queryset().select_related('user', 'room', 'series')
+        return super().get_queryset()
+
+    def list(self, request, *args, **kwargs):
+        """
+        Listar reservas, opcionalmente filtradas.
+
+        ``fields`` (ej. "id,state,room_details.location") y ``expand`` (ej.
+        "room_details") limitan los campos de la respuesta y lo que se consulta.
+
+        Query params:
+            user: ID del usuario
+            room: ID de la sala
+            state: Estados separados por coma (ej. "Confirmada,Pendiente")
+            active: "true" para excluir las reservas canceladas o terminadas
+            day: Día de la semana (ej. "Jueves" o día ISO 4)
+            hour_block: Bloque horario (ej. "10:00-11:30" o "10:00")
+            start, end: Rango de fechas YYYY-MM-DD de las reservas con fecha (inclusive)
+        """
+        try:
+            filters = self._list_filters(request.query_params)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = collectionEtag(
+            request, Reservation.objects.all(), Room.objects.all(),
+            RecreativeElement.objects.all(), get_user_model().objects.all()
+        )
+        cached = notModified(request, etag)
+        if cached:
+            return cached
+        page = self.paginate_queryset(self.get_queryset().search(**filters))
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response['ETag'] = etag
+        return response
+
+    def _list_filters(self, params):
+        """
+        Keyword arguments of ReservationQuerySet.search from the list query params.
+
+        Raises:
+            ValueError: Si algún filtro no es válido
+        """
+        filters = {}
+        if params.get('user'):
+            filters['user_id'] = params['user']
+        if params.get('room'):
+            try:
+                filters['room_id'] = int(params['room'])
+            except ValueError:
+                raise ValueError('room debe ser un número entero')
+        if params.get('state'):
+            filters['states'] = [state.strip() for state in params['state'].split(',') if state.strip()]
+        filters['active'] = params.get('active', '').lower() in ('1', 'true')
+
+        day, hour_block = params.get('day'), params.get('hour_block')
+        day_indexes = range(len(DAYS)) if not day else [dayIndex(day)]
+        hour_indexes = range(len(HOURS)) if not hour_block else [hourIndex(hour_block)]
+        if None in day_indexes or None in hour_indexes:
+            raise ValueError('day o hour_block no son válidos')
+        if day or hour_block:
+            filters['slot_codes'] = [slotCode(day_index, hour_index)
+                                     for day_index in day_indexes for hour_index in hour_indexes]
+
+        try:
+            for field in ('start', 'end'):
+                if params.get(field):
+                    filters[field] = date.fromisoformat(params[field])
+        except ValueError:
+            raise ValueError('start y end deben tener formato YYYY-MM-DD')
+        return filters
+
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return ReservationCreateSerializer
         return ReservationSerializer
     
-    def _validate_new_reservation(self, room_id, reserved_day, reserved_hour_block):
+    def _lock_room(self, room):
+        list(Room.objects.select_for_update().filter(id=room.id).values_list('id'))
+
+    def _reserve(self, room, reserved_day, reserved_hour_block, reserved_date=None):
         """
-        Validar una nueva reserva de sala (solo para creación)
-        
-        Args:
-            room_id: ID de la sala a reservar
-            reserved_day: Día de la semana (en español)
-            reserved_hour_block: Bloque horario (e.g., "7:00-8:30")
-            
-        Returns:
-            room: Objeto Room si la validación es exitosa
-            
+        Reservar el horario en la semana concreta de la fecha o, sin fecha, todas las semanas.
+
+        Series are checked after the room's conditional UPDATE, which holds
+        the room row lock until the end of the transaction. A conflict raises,
+        so the caller's transaction must roll back.
+
         Raises:
-            Response: Respuesta HTTP con error si hay problemas
+            customException: Si la sala ya está reservada en ese horario
         """
-        try:
-            room = Room.objects.get(id=room_id)
-        except Room.DoesNotExist:
-            return Response({"detail": "La sala no existe"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if not room.is_available(reserved_day, reserved_hour_block):
+        if reserved_date:
+            room.reserveRoomOn(reserved_date, reserved_hour_block)
+            if ReservationSeries.objects.occurring_on(room.id, reserved_hour_block, reserved_date):
+                exception.raise_room_already_reserved()
+        else:
+            room.reserveRoom(reserved_day, reserved_hour_block)
+            if ReservationSeries.objects.upcoming_weekly(room.id, reserved_hour_block, Room.DAYS[reserved_day]):
+                exception.raise_room_already_reserved()
+
+    def _series_conflict(self, room, hour_block, recurrence, series=None):
+        """
+        Lock the room and find the first date a series would collide with
+        another booking in that block.
+
+        Returns:
+            Response: Error 400 si la serie choca con otra reserva, None si no
+        """
+        self._lock_room(room)
+        candidate = series or ReservationSeries()
+        for field, value in recurrence.items():
+            setattr(candidate, field, value)
+        conflict = candidate.firstConflict(room.id, hour_block)
+        if conflict:
             return Response(
-                {"detail": "El horario seleccionado ya está reservado"},
+                {"detail": f"El horario seleccionado ya está reservado el {conflict.isoformat()}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    def _release(self, room, reserved_day, reserved_hour_block, reserved_date=None):
+        """
+        Liberar un horario reservado con _reserve.
+        """
+        if reserved_date:
+            return room.releaseRoomOn(reserved_date, reserved_hour_block)
+        return room.releaseRoom(reserved_day, reserved_hour_block)
+
+    def _validate_slot(self, room, reserved_day, reserved_hour_block, reserved_date, prefix=""):
+        """
+        Validar sala, día y bloque horario sin consultar la base de datos.
+
+        Returns:
+            Response: Error 400 si el horario no es válido, None si lo es
+        """
+        if not reserved_date and not room.is_available(reserved_day, reserved_hour_block):
+            return Response(
+                {"detail": f"El {prefix}horario seleccionado ya está reservado"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         # Validar bloque horario
-        valid_blocks = list(room.HOURS.keys())
-        if reserved_hour_block not in valid_blocks:
+        if reserved_hour_block not in room.HOURS:
             return Response(
-                {"detail": "El bloque horario no es válido"},
+                {"detail": f"El {prefix}bloque horario no es válido"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         # Validar día de la semana
-        valid_days = list(room.DAYS.keys())
-        if reserved_day not in valid_days:
+        if reserved_day not in room.DAYS:
             return Response(
-                {"detail": "El día de la reserva no es válido"},
+                {"detail": f"El {prefix}día de la reserva no es válido"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return None
 
-        # Intentar reservar
-        try:
-            room.reserveRoom(reserved_day, reserved_hour_block)
-            room.save()
-        except customException as e:
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        return room
+    def _validate_new_reservation(self, room, reserved_day, reserved_hour_block, reserved_date=None):
+        """
+        Validar y reservar el horario de una nueva reserva de sala
+        
+        Args:
+            room: Sala a reservar (ya cargada por el serializer)
+            reserved_day: Día de la semana (en español)
+            reserved_hour_block: Bloque horario (e.g., "7:00-8:30")
+            reserved_date: Fecha concreta (opcional)
+            
+        Returns:
+            Response: Respuesta HTTP con error si la validación falla, None si no
+            
+        Raises:
+            customException: Si la sala ya está reservada (la transacción debe revertirse)
+        """
+        error = self._validate_slot(room, reserved_day, reserved_hour_block, reserved_date)
+        if error:
+            return error
+        self._reserve(room, reserved_day, reserved_hour_block, reserved_date)
+        return None
 
-    def _validate_update_reservation(self, reservation, new_room_id, new_day, new_hour_block):
+    def _validate_update_reservation(self, reservation, new_room, new_day, new_hour_block, new_date=None):
         """
-        Validar actualización de una reserva existente
+        Validar y mover el horario de una reserva existente
         
+        Only touches the rooms when the room, day, block or date actually
+        change; then the old slot is released and the new one reserved, one
+        conditional UPDATE per room. A failure raises so the whole
+        transaction rolls back instead of re-reserving the old slot by hand.
+
         Args:
             reservation: Objeto Reservation a actualizar
-            new_room_id: Nuevo ID de sala (puede ser el mismo)
+            new_room: Nueva sala (puede ser la misma)
             new_day: Nuevo día (puede ser el mismo)
             new_hour_block: Nuevo bloque horario (puede ser el mismo)
+            new_date: Nueva fecha concreta (opcional)
             
         Returns:
-            tuple: (room, new_day, new_hour_block) si la validación es exitosa
-            
+            Response: Respuesta HTTP con error si la validación falla, None si no
+
         Raises:
-            Response: Respuesta HTTP con error si hay problemas
+            customException: Si el nuevo horario ya está reservado
         """
-        try:
-            new_room = Room.objects.get(id=new_room_id)
-        except Room.DoesNotExist:
-            return Response({"detail": "La nueva sala no existe"}, status=status.HTTP_400_BAD_REQUEST)
+        current = (reservation.room_id, reservation.reserved_day,
+                   reservation.reserved_hour_block, reservation.reserved_date)
+        if (new_room.id, new_day, new_hour_block, new_date) == current:
+            return None
 
-        # Validar que la nueva sala no esté ocupada (excepto por esta reserva)
-        if not new_room.is_available(new_day, new_hour_block):
-            return Response(
-                {"detail": "El nuevo horario ya está reservado"},
-                status=status.HTTP_400_BAD_REQUEST
+        error = self._validate_slot(new_room, new_day, new_hour_block, new_date, prefix="nuevo ")
+        if error:
+            return error
+
+        # Liberar la reserva anterior y reservar la nueva configuración
+        if reservation.room_id and reservation.reserved_day and reservation.reserved_hour_block:
+            self._release(reservation.room, reservation.reserved_day,
+                          reservation.reserved_hour_block, reservation.reserved_date)
+        self._reserve(new_room, new_day, new_hour_block, new_date)
+        return None
+
+    def _requested_element_ids(self, items):
+        """
+        Element ids referenced by the borrowed_elements of a raw batch.
+        """
+        element_ids = set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            for element_data in item.get('borrowed_elements') or []:
+                try:
+                    element_ids.add(int(element_data.get('element')))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+        return element_ids
+
+    def _create_batch(self, items):
+        """
+        Validate and create a batch of reservations inside the current transaction.
+
+        Las salas afectadas se bloquean una sola vez, los horarios se asignan
+        en bloque y las reservas y sus elementos se insertan con bulk_create.
+
+        Returns:
+            tuple: (results, created) con el resultado de cada elemento, en orden,
+                   y el número de reservas creadas.
+        """
+        results = [None] * len(items)
+        accepted = []
+
+        element_ids = set(RecreativeElement.objects.filter(
+            id__in=self._requested_element_ids(items)
+        ).values_list('id', flat=True))
+
+        validated = []
+        for index, item in enumerate(items):
+            serializer = ReservationCreateSerializer(data=item, context={'element_ids': element_ids})
+            if serializer.is_valid():
+                validated.append((index, serializer.validated_data))
+            else:
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+
+        room_ids = sorted({data['room'].id for _, data in validated if data.get('room')})
+        # Lock affected rooms once, in id order to avoid deadlocks between batches
+        list(Room.objects.select_for_update().filter(id__in=room_ids).order_by('id').values_list('id'))
+        dates = [data['reserved_date'] for _, data in validated if data.get('reserved_date')]
+        detector = ConflictDetector.load(room_ids, min(dates, default=None), max(dates, default=None))
+
+        ledger = ElementLedger(
+            {element_data['element'] for _, data in validated for element_data in data.get('borrowed_elements', [])},
+            {(data.get('reserved_day'), data.get('reserved_hour_block')) for _, data in validated}
+        )
+
+        new_slots = []
+        for index, data in validated:
+            room = data.get('room')
+            day = data.get('reserved_day')
+            hour_block = data.get('reserved_hour_block')
+            reserved_date = data.get('reserved_date')
+            slot = None
+            if data.get('recurrence') is not None:
+                results[index] = {"index": index, "status": "error",
+                                  "errors": {"recurrence": ["Las series se crean una a una."]}}
+                continue
+            if room and day and hour_block:
+                try:
+                    day_index, hour_index = Room.slotIndexes(day, hour_block)
+                except customException as e:
+                    results[index] = {"index": index, "status": "error", "errors": {"detail": str(e)}}
+                    continue
+                slot = (room.id, day_index, hour_index)
+                if detector.conflictsOn(room.id, reserved_date, hour_index) if reserved_date \
+                        else detector.conflictsWeekly(room.id, day_index, hour_index):
+                    results[index] = {"index": index, "status": "error",
+                                      "errors": {"detail": "El horario seleccionado ya está reservado"}}
+                    continue
+
+            amounts = {element_data['element']: element_data['amount']
+                       for element_data in data.get('borrowed_elements', [])}
+            if data.get('state') not in Reservation.INACTIVE_STATES:
+                try:
+                    ledger.allocate(day, hour_block, amounts)
+                except customException as e:
+                    results[index] = {"index": index, "status": "error",
+                                      "errors": {"borrowed_elements": [str(e)]}}
+                    continue
+
+            if slot is not None and reserved_date:
+                try:
+                    room.reserveRoomOn(reserved_date, hour_block)
+                except customException as e:
+                    results[index] = {"index": index, "status": "error", "errors": {"detail": str(e)}}
+                    continue
+                detector.bookOn(room.id, reserved_date, hour_index)
+            elif slot is not None:
+                detector.bookWeekly(room.id, day_index, hour_index)
+                new_slots.append(slot)
+            accepted.append((index, data))
+
+        Room.reserveSlots(new_slots)
+
+        reservations = Reservation.objects.bulk_create([
+            Reservation(**{key: value for key, value in data.items() if key != 'borrowed_elements'}).refreshSlotCode()
+            for _, data in accepted
+        ])
+        ReservationXElements.objects.bulk_create([
+            ReservationXElements(
+                reservation=reservation,
+                element_id=element_data['element'],
+                amount=element_data['amount']
             )
+            for reservation, (_, data) in zip(reservations, accepted)
+            for element_data in data.get('borrowed_elements', [])
+        ])
+        applyBookingDelta([], [reservation.booking() for reservation in reservations])
 
-        # Validar bloque horario
-        valid_blocks = list(new_room.HOURS.keys())
-        if new_hour_block not in valid_blocks:
+        for reservation, (index, _) in zip(reservations, accepted):
+            results[index] = {"index": index, "status": "created", "id": reservation.id}
+        return results, len(accepted)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Crear varias reservas en una sola transacción.
+
+        Body: lista de reservas (mismo formato que POST /reservation/) o
+        {"reservations": [...]}.
+
+        Returns:
+            Response: {"results": [...]} con el resultado de cada elemento, en orden.
+        """
+        items = request.data if isinstance(request.data, list) else request.data.get('reservations')
+        if not isinstance(items, list) or not items:
             return Response(
-                {"detail": "El nuevo bloque horario no es válido"},
+                {"detail": "Se requiere una lista de reservas"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Validar día de la semana
-        valid_days = list(new_room.DAYS.keys())
-        if new_day not in valid_days:
+        with transaction.atomic():
+            results, created = self._create_batch(items)
+
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        return Response({"results": results}, status=response_status)
+
+    @action(detail=False, methods=['post'], url_path='assign')
+    def assign(self, request):
+        """
+        Asignar salas automáticamente a una lista de necesidades.
+
+        Body: {"requests": [{"user", "capacity", "elements": [ids],
+        "reserved_day" o "reserved_date", "reserved_hour_block", "state"}],
+        "commit": false, "workers": null}. Sin commit devuelve solo el plan;
+        con commit crea las reservas asignadas en la misma transacción.
+        _create_batch bloquea solo las salas del plan y vuelve a validar
+        cada reserva, así que una asignación que choque con una reserva
+        concurrente se informa como error.
+
+        Returns:
+            Response: {"results": [...], "assigned": n, "unassigned": m}
+        """
+        items = request.data.get('requests') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
             return Response(
-                {"detail": "El nuevo día de la reserva no es válido"},
+                {"detail": "Se requiere una lista de necesidades"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        commit = isinstance(request.data, dict) and bool(request.data.get('commit'))
+        workers = request.data.get('workers') if isinstance(request.data, dict) else None
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            return Response({"detail": "workers debe ser un entero positivo"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Liberar la reserva anterior
-        try:
-            reservation.room.releaseRoom(reservation.reserved_day, reservation.reserved_hour_block)
-            reservation.room.save()
-        except customException as e:
-            return Response({"detail": f"Error al liberar la reserva anterior: {str(e)}"},
-                          status=status.HTTP_400_BAD_REQUEST)
+        results = [None] * len(items)
+        needs = []
+        for index, item in enumerate(items):
+            serializer = RoomNeedSerializer(data=item)
+            if serializer.is_valid():
+                needs.append((index, serializer.validated_data))
+            else:
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
 
-        # Reservar la nueva configuración
-        try:
-            new_room.reserveRoom(new_day, new_hour_block)
-            new_room.save()
-        except customException as e:
-            # Revertir la liberación si falla la nueva reserva
-            try:
-                reservation.room.reserveRoom(reservation.reserved_day, reservation.reserved_hour_block)
-                reservation.room.save()
-            except Exception:
-                pass
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            plan = assignRooms([need for _, need in needs], workers=workers)
+            for (index, _), room_id in zip(needs, plan):
+                results[index] = {"index": index, "status": "assigned" if room_id else "unassigned", "room": room_id}
 
-        return new_room, new_day, new_hour_block
+            if commit:
+                assigned = [(index, need, room_id) for (index, need), room_id in zip(needs, plan) if room_id]
+                rooms = Room.objects.only('id', 'location').in_bulk([room_id for _, _, room_id in assigned])
+                created, _ = self._create_batch([
+                    {
+                        "location": rooms[room_id].location, "state": need['state'], "user": need['user'].id,
+                        "room": room_id, "reserved_hour_block": need['reserved_hour_block'],
+                        **({"reserved_date": need['reserved_date']} if need['reserved_date']
+                           else {"reserved_day": need['reserved_day']}),
+                    }
+                    for index, need, room_id in assigned
+                ])
+                for (index, _, room_id), outcome in zip(assigned, created):
+                    results[index] = dict(outcome, index=index, room=room_id)
+
+        fulfilled = sum(1 for result in results if result['status'] in ("assigned", "created"))
+        return Response(
+            {"results": results, "assigned": fulfilled, "unassigned": len(items) - fulfilled},
+            status=status.HTTP_201_CREATED if commit and fulfilled else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Exportar todas las reservas como JSON Lines (por defecto) o CSV.
+
+        Query params:
+            file_format: "jsonl" o "csv"
+        """
+        file_format = request.query_params.get('file_format', 'jsonl')
+        response = stream_export(
+            Reservation.objects.with_details().order_by('id'),
+            ReservationSerializer, file_format, 'reservations'
+        )
+        if response is None:
+            return Response(
+                {"detail": f"Formato no soportado. Use uno de: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return response
 
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        room_id = serializer.validated_data.get('room')
+        room = serializer.validated_data.get('room')
         reserved_day = serializer.validated_data.get('reserved_day')
         reserved_hour_block = serializer.validated_data.get('reserved_hour_block')
+        reserved_date = serializer.validated_data.get('reserved_date')
+        recurrence = serializer.validated_data.get('recurrence')
 
-        if room_id and reserved_day and reserved_hour_block:
-            result = self._validate_new_reservation(room_id.id, reserved_day, reserved_hour_block)
-            if isinstance(result, Response):
-                return result
+        try:
+            with transaction.atomic():
+                result = None
+                if recurrence is not None:
+                    result = self._series_conflict(room, reserved_hour_block, recurrence)
+                elif room and reserved_day and reserved_hour_block:
+                    result = self._validate_new_reservation(room, reserved_day, reserved_hour_block, reserved_date)
+                if result:
+                    return result
+                reservation = serializer.save()
+        except customException as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        reservation = serializer.save()
         response_serializer = ReservationSerializer(reservation)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
-    @transaction.atomic
     def update(self, request, *args, **kwargs):
         reservation = self.get_object()
         serializer = self.get_serializer(reservation, data=request.data, partial=kwargs.get('partial', False))
         serializer.is_valid(raise_exception=True)
 
-        room_id = serializer.validated_data.get('room', reservation.room)
+        room = serializer.validated_data.get('room', reservation.room)
         reserved_day = serializer.validated_data.get('reserved_day', reservation.reserved_day)
         reserved_hour_block = serializer.validated_data.get('reserved_hour_block', reservation.reserved_hour_block)
+        reserved_date = serializer.validated_data.get('reserved_date', reservation.reserved_date)
+        recurrence = serializer.validated_data.get('recurrence')
+        series = getattr(reservation, 'series', None)
+        extra = {}
 
-        if room_id and reserved_day and reserved_hour_block:
-            result = self._validate_update_reservation(
-                reservation,
-                room_id.id,
-                reserved_day,
-                reserved_hour_block
-            )
-            if isinstance(result, Response):
-                return result
+        try:
+            with transaction.atomic():
+                result = None
+                if recurrence is not None or series is not None:
+                    rule = recurrence or {field: getattr(series, field)
+                                          for field in ('weekdays', 'start_date', 'end_date', 'exceptions')}
+                    # A reservation turned into a series gives back its weekly or dated
+                    # slot first, so the series is not checked against its own booking
+                    if series is None and reservation.room \
+                            and reservation.reserved_day and reservation.reserved_hour_block:
+                        self._lock_room(reservation.room)
+                        self._release(reservation.room, reservation.reserved_day,
+                                      reservation.reserved_hour_block, reservation.reserved_date)
+                    result = self._series_conflict(room, reserved_hour_block, rule, series)
+                    extra = {'reserved_day': None, 'reserved_date': None}
+                elif room and reserved_day and reserved_hour_block:
+                    result = self._validate_update_reservation(
+                        reservation,
+                        room,
+                        reserved_day,
+                        reserved_hour_block,
+                        reserved_date
+                    )
+                if result:
+                    # Undo a slot released above before answering the error
+                    transaction.set_rollback(True)
+                    return result
+                updated_reservation = serializer.save(**extra)
+        except customException as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_reservation = serializer.save()
         response_serializer = ReservationSerializer(updated_reservation)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
-    @transaction.atomic
     def destroy(self, request, *args, **kwargs):
         reservation = self.get_object()
-        
-        if reservation.room and reservation.reserved_day and reservation.reserved_hour_block:
-            room = reservation.room
-            try:
-                # Liberar el horario específico
-                room.releaseRoom(reservation.reserved_day, reservation.reserved_hour_block)
-   
-            except customException as e:
-                return Response(
-                    {"detail": f"Error al liberar la sala: {str(e)}"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Eliminar la reserva
-        return super().destroy(request, *args, **kwargs)
+
+        try:
+            with transaction.atomic():
+                if reservation.room and reservation.reserved_day and reservation.reserved_hour_block:
+                    # Liberar el horario específico
+                    self._release(reservation.room, reservation.reserved_day,
+                                  reservation.reserved_hour_block, reservation.reserved_date)
+                # Eliminar la reserva
+                self.perform_destroy(reservation)
+        except customException as e:
+            return Response(
+                {"detail": f"Error al liberar la sala: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
     
 class ReservationElementViewSet(viewsets.ModelViewSet):
     queryset = ReservationXElements.objects.all()
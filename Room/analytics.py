@@ -0,0 +1,83 @@
+import numpy as np
+
+HOUR_BLOCKS = 8
+DAYS = 6
+
+
+def masksToGrids(masks):
+    """
+    Unpack availability masks into a boolean array of shape (len(masks), 8, 6).
+
+    Args:
+        masks (array-like): ``Room.availability_mask`` values.
+
+    Returns:
+        numpy.ndarray: ``grids[room, hour_index, day_index]`` is True when reserved.
+    """
+    masks = np.asarray(masks, dtype=np.uint64).reshape(-1, 1)
+    bits = (masks >> np.arange(HOUR_BLOCKS * DAYS, dtype=np.uint64)) & np.uint64(1)
+    return bits.astype(bool).reshape(-1, HOUR_BLOCKS, DAYS)
+
+
+def loadGrids(rooms):
+    """
+    Read the availability of a Room queryset into memory with a single query.
+
+    Args:
+        rooms (QuerySet): Rooms to analyse.
+
+    Returns:
+        tuple: (room ids as numpy.ndarray, grids of shape (rooms, 8, 6))
+    """
+    rows = np.array(list(rooms.order_by('id').values_list('id', 'availability_mask')), dtype=np.int64)
+    if not len(rows):
+        return np.empty(0, dtype=np.int64), np.zeros((0, HOUR_BLOCKS, DAYS), dtype=bool)
+    return rows[:, 0], masksToGrids(rows[:, 1])
+
+
+def utilizationReport(room_ids, grids, hour_blocks, days, peaks=3, idle_limit=100):
+    """
+    Vectorized utilization summary of a stack of weekly grids.
+
+    ``grids`` may hold several weeks per room as long as the leading axis
+    lines up with ``room_ids``.
+
+    Args:
+        room_ids (numpy.ndarray): Room id of each grid.
+        grids (numpy.ndarray): Boolean array of shape (n, 8, 6).
+        hour_blocks (list): Hour block labels in index order.
+        days (list): Day labels in index order.
+        peaks (int): Number of busiest (hour block, day) slots to report.
+        idle_limit (int): Maximum number of idle room ids to list.
+
+    Returns:
+        dict: Utilization percentages per hour block, day and slot, the peak
+        slots, the overall utilization and the rooms with no reservation.
+    """
+    if not len(grids):
+        per_slot = np.zeros((HOUR_BLOCKS, DAYS))
+        per_room = np.zeros(0)
+    else:
+        per_slot = grids.mean(axis=0)
+        per_room = grids.mean(axis=(1, 2))
+
+    order = np.argsort(per_slot, axis=None, kind='stable')[::-1][:peaks]
+    idle = room_ids[per_room == 0]
+
+    return {
+        'total_rooms': int(len(room_ids)),
+        'utilization': round(float(per_slot.mean()) * 100, 2),
+        'per_hour_block': dict(zip(hour_blocks, np.round(per_slot.mean(axis=1) * 100, 2).tolist())),
+        'per_day': dict(zip(days, np.round(per_slot.mean(axis=0) * 100, 2).tolist())),
+        'per_slot': np.round(per_slot * 100, 2).tolist(),
+        'peak_blocks': [
+            {
+                'hour_block': hour_blocks[index // DAYS],
+                'day': days[index % DAYS],
+                'utilization': round(float(per_slot.flat[index]) * 100, 2),
+            }
+            for index in order.tolist()
+        ],
+        'idle_room_count': int(len(idle)),
+        'idle_rooms': idle[:idle_limit].tolist(),
+    }
@@ -0,0 +1,67 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Seconds a cached availability mask is kept when nothing invalidates it
+AVAILABILITY_TIMEOUT = 300
+
+
+# Bumped on every availability change of any room
+OCCUPANCY_VERSION_KEY = "rooms:occupancy:version"
+
+
+def _versionKey(room_id):
+    return f"room:{room_id}:availability:version"
+
+
+def _currentVersion(key):
+    """
+    Read a version counter. A missing one (never set or evicted) is recreated
+    from the clock, so it never points back at data cached under an earlier version.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bumpVersion(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def availabilityVersion(room_id):
+    """
+    Current cache version of a room's availability.
+    """
+    return _currentVersion(_versionKey(room_id))
+
+
+def availabilityKey(room_id, version):
+    return f"room:{room_id}:availability:{version}"
+
+
+def invalidateAvailability(room_id):
+    """
+    Bump the room's availability version once the current transaction commits.
+
+    Bumping after commit keeps readers from caching the pre-commit value under
+    the new version.
+    """
+    def bump():
+        _bumpVersion(_versionKey(room_id))
+        _bumpVersion(OCCUPANCY_VERSION_KEY)
+
+    transaction.on_commit(bump)
+
+
+def occupancyKey(*params):
+    """
+    Cache key of a weekly occupancy summary, valid until the next booking change.
+    """
+    version = _currentVersion(OCCUPANCY_VERSION_KEY)
+    return f"rooms:occupancy:{version}:" + ":".join(str(param) for param in params)
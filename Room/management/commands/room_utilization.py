@@ -0,0 +1,55 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from Room.analytics import loadGrids, masksToGrids, utilizationReport
+from Room.models import Room
+
+
+class Command(BaseCommand):
+    help = "Print room utilization (per hour block, day and slot, peak blocks and idle rooms) as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-capacity', type=int, default=0, help="Only rooms with at least this capacity.")
+        parser.add_argument('--peaks', type=int, default=3, help="Number of peak slots to list.")
+        parser.add_argument('--idle-limit', type=int, default=100, help="Maximum idle room ids to list.")
+        parser.add_argument(
+            '--benchmark', type=int, metavar='ROOMS',
+            help="Time the analysis on ROOMS synthetic rooms instead of reading the database."
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self._benchmark(options['benchmark'])
+            return
+
+        rooms = Room.objects.all()
+        if options['min_capacity']:
+            rooms = rooms.filter(capacity__gte=options['min_capacity'])
+
+        room_ids, grids = loadGrids(rooms)
+        report = utilizationReport(
+            room_ids, grids, list(Room.HOURS), list(Room.DAYS),
+            peaks=options['peaks'], idle_limit=options['idle_limit']
+        )
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+    def _benchmark(self, count):
+        rng = np.random.default_rng(0)
+        masks = rng.integers(0, Room.FULLY_BOOKED_MASK, size=count, dtype=np.int64, endpoint=True)
+        masks[rng.random(count) < 0.05] = 0
+        room_ids = np.arange(1, count + 1)
+
+        start = time.perf_counter()
+        grids = masksToGrids(masks)
+        unpacked = time.perf_counter()
+        report = utilizationReport(room_ids, grids, list(Room.HOURS), list(Room.DAYS))
+        done = time.perf_counter()
+
+        self.stdout.write(
+            f"{count} rooms: unpack {(unpacked - start) * 1000:.1f} ms, "
+            f"report {(done - unpacked) * 1000:.1f} ms, "
+            f"utilization {report['utilization']}%, idle {report['idle_room_count']}"
+        )
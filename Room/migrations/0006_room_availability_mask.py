@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+def pack_availability(apps, schema_editor):
+    Room = apps.get_model('Room', 'Room')
+    for room in Room.objects.only('id', 'availability').iterator():
+        mask = 0
+        for hour_index, row in enumerate(room.availability or []):
+            for day_index, cell in enumerate(row):
+                if cell:
+                    mask |= 1 << (hour_index * 6 + day_index)
+        Room.objects.filter(id=room.id).update(availability_mask=mask)
+
+
+def unpack_availability(apps, schema_editor):
+    Room = apps.get_model('Room', 'Room')
+    for room in Room.objects.only('id', 'availability_mask').iterator():
+        grid = [[(room.availability_mask >> (hour_index * 6 + day_index)) & 1 for day_index in range(6)]
+                for hour_index in range(8)]
+        Room.objects.filter(id=room.id).update(availability=grid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Room', '0005_remove_room_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='availability_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(pack_availability, unpack_availability),
+        migrations.RemoveField(
+            model_name='room',
+            name='availability',
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_slots(apps, schema_editor):
+    Room = apps.get_model('Room', 'Room')
+    RoomSlot = apps.get_model('Room', 'RoomSlot')
+    slots = []
+    for room_id, mask in Room.objects.values_list('id', 'availability_mask').iterator():
+        for hour_index in range(8):
+            for day_index in range(6):
+                if mask >> (hour_index * 6 + day_index) & 1:
+                    slots.append(RoomSlot(room_id=room_id, day_index=day_index, hour_index=hour_index))
+    RoomSlot.objects.bulk_create(slots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Room', '0006_room_availability_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_index', models.PositiveSmallIntegerField()),
+                ('hour_index', models.PositiveSmallIntegerField()),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='Room.room')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day_index', 'hour_index'], name='Room_roomsl_day_ind_a6c96a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('room', 'day_index', 'hour_index'), name='unique_room_slot')],
+            },
+        ),
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
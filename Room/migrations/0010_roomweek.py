@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Room', '0009_room_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('availability_mask', models.BigIntegerField(default=0)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weeks', to='Room.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'week_start'), name='unique_room_week')],
+            },
+        ),
+    ]
@@ -1,10 +1,126 @@
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q, Count, Exists, OuterRef, Prefetch, Case, When, Value
+from django.db.models.functions import Now
+from django.db.models.lookups import Exact
 from Exceptions.customException import exception, customException
 from RecreativeElement.models import RecreativeElement
+from django.core.cache import cache
+from django.utils import timezone
+from .cache import AVAILABILITY_TIMEOUT, availabilityKey, availabilityVersion, invalidateAvailability
+from .slots import DAY_INDEX, HOUR_INDEX, dayIndex, hourIndex, slotCode
 
 def defaultAvailability():
     return [[0] * 6 for _ in range(8)]
 
+
+def encodeAvailability(grid):
+    """
+    Pack an 8x6 availability matrix into a 48-bit integer.
+
+    Bit ``hour_index * 6 + day_index`` is set when the slot is reserved.
+
+    Args:
+        grid (list): 8 lists (hour blocks) of 6 cells (days), each 0 or 1.
+
+    Returns:
+        int: Bitmask with one bit per reserved slot.
+
+    Raises:
+        customException: If the matrix does not have the 8x6 shape.
+    """
+    if not isinstance(grid, list) or len(grid) != 8 or \
+            any(not isinstance(row, list) or len(row) != 6 for row in grid):
+        exception.raise_invalid_room_availability()
+    mask = 0
+    for hour_index, row in enumerate(grid):
+        for day_index, cell in enumerate(row):
+            if cell:
+                mask |= 1 << (hour_index * 6 + day_index)
+    return mask
+
+
+def decodeAvailability(mask):
+    """
+    Unpack a 48-bit availability mask into the 8x6 matrix used by the API.
+
+    Args:
+        mask (int): Bitmask produced by ``encodeAvailability``.
+
+    Returns:
+        list: 8 lists (hour blocks) of 6 cells (days), 1 when reserved.
+    """
+    return [[(mask >> (hour_index * 6 + day_index)) & 1 for day_index in range(6)]
+            for hour_index in range(8)]
+
+
+class RoomQuerySet(models.QuerySet):
+    def free_at(self, day_index, hour_index):
+        """
+        Rooms without an occupied RoomSlot at the given day and hour block.
+
+        Resolved as a NOT EXISTS anti-join over the RoomSlot unique index
+        instead of decoding every room's availability.
+        """
+        return self.filter(~Exists(RoomSlot.objects.filter(
+            room=OuterRef('pk'), day_index=day_index, hour_index=hour_index
+        )))
+
+    def weekly_occupancy(self):
+        """
+        Booked and free rooms per (day, hour block) over this queryset.
+
+        Computed in a single aggregate query over RoomSlot: one filtered
+        COUNT per slot on a LEFT JOIN of the rooms with their slots.
+
+        Returns:
+            dict: {'total_rooms': int, 'occupancy': [{'day', 'hour_block',
+            'booked', 'free', 'utilization'}, ...]} in hour-block, day order.
+        """
+        counts = self.order_by().aggregate(
+            total_rooms=Count('id', distinct=True),
+            **{
+                f"slot_{hour_index}_{day_index}": Count(
+                    'slots', filter=Q(slots__day_index=day_index, slots__hour_index=hour_index)
+                )
+                for hour_index in Room.HOURS.values()
+                for day_index in Room.DAYS.values()
+            }
+        )
+        total = counts['total_rooms']
+        occupancy = []
+        for hour_block, hour_index in Room.HOURS.items():
+            for day, day_index in Room.DAYS.items():
+                booked = counts[f"slot_{hour_index}_{day_index}"]
+                occupancy.append({
+                    'day': day,
+                    'hour_block': hour_block,
+                    'booked': booked,
+                    'free': total - booked,
+                    'utilization': round(100 * booked / total, 2) if total else 0.0,
+                })
+        return {'total_rooms': total, 'occupancy': occupancy}
+
+    def with_elements(self):
+        """
+        Prefetch the room elements and their RecreativeElement in one extra query.
+        """
+        return self.prefetch_related(Prefetch(
+            'roomxelements_set',
+            queryset=RoomXElements.objects.select_related('element')
+        ))
+
+    def for_fields(self, fields):
+        """
+        Rooms loading only what RoomReadSerializer renders for ``fields``:
+        the matching columns, and the elements only when listed.
+        """
+        columns = {'location': 'location', 'capacity': 'capacity',
+                   'description': 'description', 'availability': 'availability_mask'}
+        rooms = self.with_elements() if 'elementos' in fields else self
+        return rooms.only('id', *(columns[name] for name in fields if name in columns))
+
+
 class Room(models.Model):
     """
     Represents a room with recreative elements.
@@ -14,48 +130,150 @@ class Room(models.Model):
         location (str): Room location.
         capacity (int): Maximum capacity of the room.
         description (str): Optional description of the room.
-        availability (list): Room availability by schedules and days.
+        availability_mask (int): Reserved slots packed as a 48-bit mask (hour_index * 6 + day_index).
+        availability (list): 8x6 matrix view of ``availability_mask`` (hour blocks x days).
         recreative_elements (ManyToMany[RecreativeElement]): Associated recreational elements.
+        updated_at (datetime): Last change to the room, its availability or its elements.
     """
 
     id = models.AutoField(primary_key=True)
     location = models.CharField(max_length=150, blank=False)
     capacity = models.IntegerField(blank=False)
     description = models.TextField(blank=True)
-    availability = models.JSONField(default=defaultAvailability, blank=False, null=False)
+    availability_mask = models.BigIntegerField(default=0, blank=False, null=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     recreative_elements = models.ManyToManyField(RecreativeElement, through='RoomXElements', related_name='rooms')
 
-    HOURS = {
-        "7:00-8:30": 0,
-        "8:30-10:00": 1,
-        "10:00-11:30": 2,
-        "11:30-13:00": 3,
-        "13:00-14:30": 4,
-        "14:30-16:00": 5,
-        "16:00-17:30": 6,
-        "17:30-19:00": 7
-    }
-
-    DAYS = {
-        "Lunes": 0,
-        "Martes": 1,
-        "Miércoles": 2,
-        "Jueves": 3,
-        "Viernes": 4,
-        "Sabado": 5
-    }
+    objects = RoomQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['capacity']),
+        ]
+
+    # Canonical names and their indexes; Room/slots.py also parses aliases
+    HOURS = HOUR_INDEX
+    DAYS = DAY_INDEX
+
+    SLOT_COUNT = len(DAY_INDEX) * len(HOUR_INDEX)
+    FULLY_BOOKED_MASK = (1 << SLOT_COUNT) - 1
+
+    @property
+    def availability(self):
+        """
+        Availability as the 8x6 matrix exposed by the API (1 = reserved).
+        """
+        return decodeAvailability(self.availability_mask)
+
+    @availability.setter
+    def availability(self, grid):
+        self.availability_mask = encodeAvailability(grid)
 
     def clean(self):
         """
         Check the attributes.
 
         Raises:
-            ValidationError: if the availability format is invalid.
+            customException: if the availability mask is out of range.
         """
         super().clean()
-        if not isinstance(self.availability, list) or len(self.availability) != 8 or len(self.availability[0]) != 6:
+        if not 0 <= self.availability_mask <= self.FULLY_BOOKED_MASK:
             exception.raise_invalid_room_availability()
 
+    def save(self, *args, **kwargs):
+        """
+        Keep the RoomSlot rows in line with ``availability_mask`` whenever it
+        is written, and drop the cached summaries that filter on capacity or location.
+        """
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or 'availability_mask' in update_fields:
+                self.syncSlots()
+                invalidateAvailability(self.id)
+            elif {'capacity', 'location'} & set(update_fields):
+                invalidateAvailability(self.id)
+
+    def delete(self, *args, **kwargs):
+        room_id = self.id
+        result = super().delete(*args, **kwargs)
+        invalidateAvailability(room_id)
+        return result
+
+    def syncSlots(self):
+        """
+        Create or delete RoomSlot rows so they match ``availability_mask``.
+        """
+        wanted = {
+            (day_index, hour_index)
+            for hour_index in range(len(self.HOURS))
+            for day_index in range(len(self.DAYS))
+            if self.availability_mask >> slotCode(day_index, hour_index) & 1
+        }
+        existing = set(self.slots.values_list('day_index', 'hour_index'))
+
+        for day_index, hour_index in existing - wanted:
+            self.slots.filter(day_index=day_index, hour_index=hour_index).delete()
+        RoomSlot.objects.bulk_create(
+            [RoomSlot(room=self, day_index=day_index, hour_index=hour_index)
+             for day_index, hour_index in wanted - existing],
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def slotIndexes(cls, day, hour):
+        """
+        Day and hour block indexes of a slot, in any spelling accepted by
+        the slot codec (ej. "Miercoles"/3, "07:00-08:30"/"7:00").
+
+        Raises:
+            customException: Si el día u horario no son válidos
+        """
+        day_index = dayIndex(day)
+        hour_index = hourIndex(hour)
+
+        if day_index is None or hour_index is None:
+            raise customException(exception.INVALID_DAYHOUR)
+
+        return day_index, hour_index
+
+    def _slotBit(self, day, hour):
+        """
+        Bit of ``availability_mask`` that represents a day and hour block.
+        """
+        return 1 << slotCode(*self.slotIndexes(day, hour))
+
+    @classmethod
+    def reserveSlots(cls, slots):
+        """
+        Reserva varios horarios de una vez.
+
+        Inserts every RoomSlot with one bulk INSERT and sets the bits of all
+        affected rooms with one UPDATE. Callers are expected to hold a lock
+        on the rooms and to have checked the slots are free; the unique slot
+        index still rejects the whole batch if one of them is taken.
+
+        Args:
+            slots (list): (room_id, day_index, hour_index) tuples.
+        """
+        if not slots:
+            return
+        bits = {}
+        for room_id, day_index, hour_index in slots:
+            bits[room_id] = bits.get(room_id, 0) | 1 << slotCode(day_index, hour_index)
+
+        with transaction.atomic():
+            RoomSlot.objects.bulk_create([
+                RoomSlot(room_id=room_id, day_index=day_index, hour_index=hour_index)
+                for room_id, day_index, hour_index in slots
+            ])
+            cls.objects.filter(id__in=bits).update(availability_mask=F('availability_mask') + Case(
+                *[When(id=room_id, then=Value(room_bits)) for room_id, room_bits in bits.items()],
+                output_field=models.BigIntegerField()
+            ), updated_at=Now())
+        for room_id in bits:
+            invalidateAvailability(room_id)
+
     def reserveRoom(self, day, hour):
         """
         Reserva la sala en un horario específico.
@@ -70,20 +288,117 @@ class Room(models.Model):
         Raises:
             customException: Si la sala ya está reservada en ese horario
         """
-        day_index = self.DAYS.get(day)
-        hour_index = self.HOURS.get(hour)
-        
-        if day_index is None or hour_index is None:
+        day_index, hour_index = self.slotIndexes(day, hour)
+        bit = self._slotBit(day, hour)
+
+        # The unique (room, day_index, hour_index) index rejects a second
+        # booking of the same slot in a single INSERT, even under concurrency.
+        try:
+            with transaction.atomic():
+                RoomSlot.objects.create(room_id=self.id, day_index=day_index, hour_index=hour_index)
+                Room.objects.filter(
+                    Exact(F('availability_mask').bitand(bit), 0), id=self.id
+                ).update(availability_mask=F('availability_mask') + bit, updated_at=Now())
+                # The UPDATE holds the room row lock, so dated bookings made
+                # through reserveRoomOn are already committed and visible here.
+                if RoomWeek.objects.filter(
+                    Exact(F('availability_mask').bitand(bit), bit),
+                    room_id=self.id, week_start__gte=self.weekStart(timezone.localdate())
+                ).exists():
+                    exception.raise_room_already_reserved()
+        except IntegrityError:
+            exception.raise_room_already_reserved()
+
+        invalidateAvailability(self.id)
+        self.availability_mask |= bit
+        return True
+
+    @staticmethod
+    def weekStart(date):
+        """
+        Monday of the week a date belongs to.
+        """
+        return date - timedelta(days=date.weekday())
+
+    @classmethod
+    def dateSlotIndexes(cls, date, hour):
+        """
+        Day and hour block indexes of a concrete date.
+
+        Raises:
+            customException: Si la fecha cae en domingo o el horario no es válido
+        """
+        hour_index = hourIndex(hour)
+        if date is None or date.weekday() >= len(cls.DAYS) or hour_index is None:
             raise customException(exception.INVALID_DAYHOUR)
-            
-        if self.availability[hour_index][day_index] == 1:
-            return False
-            
-        self.availability[hour_index][day_index] = 1
-        self.save(update_fields=['availability'])
-        
+        return date.weekday(), hour_index
+
+    def reserveRoomOn(self, date, hour):
+        """
+        Reserva la sala en una fecha concreta.
+
+        The slot must be free in the weekly availability and in the
+        RoomWeek of that date. The room row is locked and touched by one
+        UPDATE conditional on the weekly bit, then the RoomWeek bit is set
+        with a conditional UPDATE (or the week row inserted with it).
+
+        Args:
+            date (date): Fecha de la reserva
+            hour (str): Bloque horario (ej. "10:00-11:30")
+
+        Returns:
+            bool: True si se reservó correctamente
+
+        Raises:
+            customException: Si la sala ya está reservada en ese horario
+        """
+        day_index, hour_index = self.dateSlotIndexes(date, hour)
+        bit = 1 << slotCode(day_index, hour_index)
+
+        week_start = self.weekStart(date)
+        with transaction.atomic():
+            if not Room.objects.filter(
+                Exact(F('availability_mask').bitand(bit), 0), id=self.id
+            ).update(updated_at=Now()):
+                exception.raise_room_already_reserved()
+
+            updated = RoomWeek.objects.filter(
+                Exact(F('availability_mask').bitand(bit), 0), room_id=self.id, week_start=week_start
+            ).update(availability_mask=F('availability_mask') + bit)
+            if not updated:
+                # The room row lock keeps other bookings of this room out until commit
+                if RoomWeek.objects.filter(room_id=self.id, week_start=week_start).exists():
+                    exception.raise_room_already_reserved()
+                RoomWeek.objects.create(room_id=self.id, week_start=week_start, availability_mask=bit)
+
+        invalidateAvailability(self.id)
         return True
 
+    def releaseRoomOn(self, date, hour):
+        """
+        Libera una sala reservada en una fecha concreta.
+
+        Returns:
+            bool: True si se liberó correctamente
+
+        Raises:
+            customException: Si la fecha o el horario no son válidos
+        """
+        day_index, hour_index = self.dateSlotIndexes(date, hour)
+        bit = 1 << slotCode(day_index, hour_index)
+
+        with transaction.atomic():
+            updated = RoomWeek.objects.filter(
+                Exact(F('availability_mask').bitand(bit), bit),
+                room_id=self.id, week_start=self.weekStart(date)
+            ).update(availability_mask=F('availability_mask') - bit)
+            if updated:
+                Room.objects.filter(id=self.id).update(updated_at=Now())
+
+        if updated:
+            invalidateAvailability(self.id)
+        return bool(updated)
+
     def releaseRoom(self, day, hour):
         """
         Libera una sala previamente reservada en un horario específico.
@@ -98,18 +413,21 @@ class Room(models.Model):
         Raises:
             customException: Si el día u horario no son válidos
         """
-        day_index = self.DAYS.get(day)
-        hour_index = self.HOURS.get(hour)
-        
-        if day_index is None or hour_index is None:
-            raise customException(exception.INVALID_DAYHOUR)
-            
-        if self.availability[hour_index][day_index] == 0:
-            return False
-            
-        self.availability[hour_index][day_index] = 0
-        self.save(update_fields=['availability'])
-        return True
+        day_index, hour_index = self.slotIndexes(day, hour)
+        bit = self._slotBit(day, hour)
+
+        with transaction.atomic():
+            deleted, _ = RoomSlot.objects.filter(
+                room_id=self.id, day_index=day_index, hour_index=hour_index
+            ).delete()
+            Room.objects.filter(
+                Exact(F('availability_mask').bitand(bit), bit), id=self.id
+            ).update(availability_mask=F('availability_mask') - bit, updated_at=Now())
+
+        if deleted:
+            invalidateAvailability(self.id)
+        self.availability_mask &= ~bit
+        return bool(deleted)
         
     def checkIfRoomIsFullyBooked(self):
         """
@@ -118,21 +436,11 @@ class Room(models.Model):
         Returns:
             bool: True si la sala está completamente reservada, False en caso contrario.
         """
-        for hour_row in self.availability:
-            for day_cell in hour_row:
-                if day_cell == 0:
-                    return False
-        return True
-    
+        return self.availability_mask.bit_count() == self.SLOT_COUNT
+
     def is_available(self, day, hour):
         """Verifica si la sala está disponible en un horario específico"""
-        day_index = self.DAYS.get(day)
-        hour_index = self.HOURS.get(hour)
-        
-        if day_index is None or hour_index is None:
-            raise customException(exception.INVALID_DAYHOUR)
-            
-        return self.availability[hour_index][day_index] == 0
+        return not self.availability_mask & self._slotBit(day, hour)
 
     def getRoomAvailability(self, roomId):
         """
@@ -145,11 +453,40 @@ class Room(models.Model):
             list: Availability of the room.
         """
         try:
-            room = Room.objects.get(id=roomId)
-            return room.availability
+            mask = Room.cachedAvailabilityMask(roomId)
+            return decodeAvailability(mask)
         except Room.DoesNotExist:
             exception.raise_room_not_found()
 
+    @classmethod
+    def cachedAvailabilityMask(cls, roomId, week_start=None):
+        """
+        Read-through cache of a room's availability mask.
+
+        Args:
+            roomId (int): Room ID.
+            week_start (date): Monday of a concrete week. When given, the
+                dated reservations of that week are merged into the mask.
+
+        Returns:
+            int: The room's availability_mask (for that week).
+
+        Raises:
+            Room.DoesNotExist: If the room does not exist.
+        """
+        version = availabilityVersion(roomId)
+        key = availabilityKey(roomId, version)
+        if week_start is not None:
+            key = f"{key}:{week_start.isoformat()}"
+        mask = cache.get(key)
+        if mask is None:
+            mask = cls.objects.values_list('availability_mask', flat=True).get(id=roomId)
+            if week_start is not None:
+                mask |= RoomWeek.objects.filter(room_id=roomId, week_start=week_start) \
+                    .values_list('availability_mask', flat=True).first() or 0
+            cache.set(key, mask, AVAILABILITY_TIMEOUT)
+        return mask
+
     def getRecrereativeElements(self, roomId):
         """
         Get the recreative elements of a room.
@@ -177,6 +514,57 @@ class Room(models.Model):
 
 
 
+class RoomSlot(models.Model):
+    """
+    An occupied (day, hour block) slot of a room.
+
+    Attributes:
+        room (Room): Room the slot belongs to.
+        day_index (int): Index of the day in ``Room.DAYS``.
+        hour_index (int): Index of the hour block in ``Room.HOURS``.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='slots')
+    day_index = models.PositiveSmallIntegerField()
+    hour_index = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room', 'day_index', 'hour_index'],
+                name='unique_room_slot'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day_index', 'hour_index']),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} - {self.day_index}/{self.hour_index}"
+
+
+class RoomWeek(models.Model):
+    """
+    Dated reservations of a room in one concrete week, packed like
+    ``Room.availability_mask`` (bit ``hour_index * 6 + day_index``).
+
+    Attributes:
+        room (Room): Room the week belongs to.
+        week_start (date): Monday of the week.
+        availability_mask (int): Slots reserved for dates of that week.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='weeks')
+    week_start = models.DateField()
+    availability_mask = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'week_start'], name='unique_room_week'),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} - {self.week_start}"
+
+
 class RoomXElements(models.Model):
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
     element = models.ForeignKey(RecreativeElement, on_delete=models.CASCADE)
@@ -184,3 +572,13 @@ class RoomXElements(models.Model):
 
     class Meta:
         unique_together = ('room', 'element')
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Room.objects.filter(id=self.room_id).update(updated_at=Now())
+
+    def delete(self, *args, **kwargs):
+        room_id = self.room_id
+        result = super().delete(*args, **kwargs)
+        Room.objects.filter(id=room_id).update(updated_at=Now())
+        return result
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Room, RoomXElements
 from RecreativeElement.models import RecreativeElement
+from config.fields import SparseFieldsMixin
 
 class RoomXElementsSerializer(serializers.ModelSerializer):
     element_id = serializers.PrimaryKeyRelatedField(
@@ -20,11 +21,28 @@ class RoomXElementsSerializer(serializers.ModelSerializer):
             'item_quantity': obj.element.item_quantity
         }
 
-class RoomReadSerializer(serializers.ModelSerializer):
+class AvailabilityField(serializers.ListField):
+    """
+    8x6 availability matrix (hour blocks x days) backed by ``Room.availability_mask``.
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault('child', serializers.ListField(
+            child=serializers.IntegerField(min_value=0, max_value=1),
+            min_length=6, max_length=6
+        ))
+        kwargs.setdefault('min_length', 8)
+        kwargs.setdefault('max_length', 8)
+        super().__init__(**kwargs)
+
+class RoomReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    availability = AvailabilityField(read_only=True)
     elementos = serializers.SerializerMethodField()
     
     def get_elementos(self, obj):
-        elements = obj.roomxelements_set.select_related('element').all()
+        # Read from the cache filled by Room.objects.with_elements() when present.
+        elements = obj.roomxelements_set.all()
+        if 'roomxelements_set' not in getattr(obj, '_prefetched_objects_cache', {}):
+            elements = elements.select_related('element')
         return [{
             'element_id': item.element.id,
             'amount': item.amount,
@@ -39,8 +57,17 @@ class RoomReadSerializer(serializers.ModelSerializer):
         model = Room
         fields = ('id', 'location', 'capacity', 'description', 'availability', 'elementos')
         read_only_fields = fields
+        # Skipped when ?expand= does not list them
+        expandable = ('availability', 'elementos')
+
+class RoomSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Room
+        fields = ('id', 'location')
+        read_only_fields = fields
 
 class RoomWriteSerializer(serializers.ModelSerializer):
+    availability = AvailabilityField(required=False)
     elementos = RoomXElementsSerializer(many=True, required=False)
 
     class Meta:
@@ -49,7 +76,6 @@ class RoomWriteSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'location': {'required': False},
             'description': {'required': False},
-            'availability': {'required': False},
             'capacity': {'required': False}
         }
 
@@ -60,7 +86,12 @@ class RoomWriteSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         
         if validated_data:
-            instance.save()
+            # Only write the submitted columns so a concurrent reservation's
+            # availability_mask update is not overwritten with a stale value.
+            instance.save(update_fields=[
+                *('availability_mask' if attr == 'availability' else attr for attr in validated_data),
+                'updated_at'
+            ])
 
         if elementos_data is not None:
             self._update_elements(instance, elementos_data)
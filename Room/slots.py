@@ -0,0 +1,122 @@
+"""
+Slot codec: the weekly (day, hour block) grid as small integers.
+
+A slot code is ``hour_index * len(DAYS) + day_index``, the same position the
+slot has as a bit in ``Room.availability_mask``. Every accepted spelling of
+a day or block is precomputed into a lookup table at import time, so
+parsing a request is one dict lookup per value.
+"""
+import unicodedata
+from datetime import time
+
+DAYS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sabado")
+HOURS = (
+    "7:00-8:30", "8:30-10:00", "10:00-11:30", "11:30-13:00",
+    "13:00-14:30", "14:30-16:00", "16:00-17:30", "17:30-19:00",
+)
+
+DAY_INDEX = {day: index for index, day in enumerate(DAYS)}
+HOUR_INDEX = {hour: index for index, hour in enumerate(HOURS)}
+SLOT_COUNT = len(DAYS) * len(HOURS)
+
+
+def slotCode(day_index, hour_index):
+    return hour_index * len(DAYS) + day_index
+
+
+# (day name, hour block) of each code, and the code of each canonical pair
+SLOTS = tuple(
+    (DAYS[code % len(DAYS)], HOURS[code // len(DAYS)]) for code in range(SLOT_COUNT)
+)
+SLOT_CODES = {slot: code for code, slot in enumerate(SLOTS)}
+
+
+def _fold(value):
+    """
+    Lowercase without accents: "Miércoles" -> "miercoles".
+    """
+    decomposed = unicodedata.normalize('NFKD', value.strip().lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _dayAliases():
+    aliases = {}
+    for index, day in enumerate(DAYS):
+        iso_weekday = index + 1
+        for alias in (day, _fold(day), str(iso_weekday), iso_weekday):
+            aliases[alias] = index
+    return aliases
+
+
+def _hourAliases():
+    aliases = {}
+    for index, block in enumerate(HOURS):
+        start, end = (time.fromisoformat(part.zfill(5)) for part in block.split('-'))
+        padded = f"{start:%H:%M}-{end:%H:%M}"
+        for alias in (block, padded, padded.replace('-', '/'), f"{start:%H:%M}",
+                      f"{start:%H:%M:%S}", block.split('-')[0], start):
+            aliases[alias] = index
+    return aliases
+
+
+_DAY_ALIASES = _dayAliases()
+_HOUR_ALIASES = _hourAliases()
+
+
+def dayIndex(value):
+    """
+    Index of a day given by name (any case, with or without accents) or
+    ISO weekday number (1 = lunes). None if it is not a bookable day.
+    """
+    try:
+        index = _DAY_ALIASES.get(value)
+    except TypeError:
+        return None
+    if index is None and isinstance(value, str):
+        index = _DAY_ALIASES.get(_fold(value))
+    return index
+
+
+def hourIndex(value):
+    """
+    Index of an hour block given as "7:00-8:30", "07:00-08:30", its start
+    time ("7:00", "07:00", "07:00:00") or a ``datetime.time``. None if unknown.
+    """
+    try:
+        index = _HOUR_ALIASES.get(value)
+    except TypeError:
+        return None
+    if index is None and isinstance(value, str):
+        index = _HOUR_ALIASES.get(value.strip())
+    return index
+
+
+def encodeSlot(day, hour):
+    """
+    Code of a (day, hour block) pair in any accepted spelling, or None.
+    """
+    try:
+        return SLOT_CODES[(day, hour)]
+    except (KeyError, TypeError):
+        pass
+    day_index, hour_index = dayIndex(day), hourIndex(hour)
+    if day_index is None or hour_index is None:
+        return None
+    return slotCode(day_index, hour_index)
+
+
+def decodeSlot(code):
+    """
+    Canonical (day name, hour block) of a slot code.
+    """
+    return SLOTS[code]
+
+
+def canonicalDay(value):
+    index = dayIndex(value)
+    return None if index is None else DAYS[index]
+
+
+def canonicalHour(value):
+    index = hourIndex(value)
+    return None if index is None else HOURS[index]
@@ -0,0 +1,45 @@
+import numpy as np
+from django.test import TestCase
+from rest_framework.test import APIClient
+from Room.analytics import masksToGrids, utilizationReport
+from Room.models import Room, decodeAvailability
+
+
+class TestRoomAnalytics(TestCase):
+    def test_masks_to_grids_matches_decode(self):
+        masks = [0, 1, 1 << 47, (1 << 13) | (1 << 30), Room.FULLY_BOOKED_MASK]
+        grids = masksToGrids(masks)
+        self.assertEqual(grids.shape, (5, 8, 6))
+        for mask, grid in zip(masks, grids):
+            self.assertEqual(grid.astype(int).tolist(), decodeAvailability(mask))
+
+    def test_report_on_large_synthetic_week(self):
+        rng = np.random.default_rng(7)
+        masks = rng.integers(0, Room.FULLY_BOOKED_MASK, size=20000, dtype=np.int64, endpoint=True)
+        masks[:50] = 0
+        room_ids = np.arange(1, 20001)
+
+        report = utilizationReport(room_ids, masksToGrids(masks), list(Room.HOURS), list(Room.DAYS), idle_limit=10)
+
+        sample = [decodeAvailability(int(mask)) for mask in masks]
+        lunes_first_block = sum(grid[0][0] for grid in sample) / len(sample) * 100
+        self.assertAlmostEqual(report['per_slot'][0][0], lunes_first_block, delta=0.01)
+        self.assertEqual(report['idle_room_count'], 50)
+        self.assertEqual(report['idle_rooms'], list(range(1, 11)))
+        self.assertEqual(len(report['peak_blocks']), 3)
+
+    def test_utilizacion_endpoint(self):
+        busy = Room.objects.create(location="Bloque H", capacity=10, description="")
+        idle = Room.objects.create(location="Bloque I", capacity=10, description="")
+        busy.reserveRoom("Viernes", "16:00-17:30")
+
+        response = APIClient().get('/room/utilizacion/', {'peaks': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['peak_blocks'],
+                         [{'hour_block': "16:00-17:30", 'day': "Viernes", 'utilization': 50.0}])
+        self.assertEqual(response.data['idle_rooms'], [idle.id])
+        self.assertEqual(response.data['per_day']["Viernes"], round(50 / 8, 2))
+
+    def test_utilizacion_rejects_negative_limits(self):
+        for params in ({'peaks': -1}, {'idle_limit': -5}):
+            self.assertEqual(APIClient().get('/room/utilizacion/', params).status_code, 400, params)
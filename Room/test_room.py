@@ -1,18 +1,25 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from unittest import skipUnless
 from unittest.mock import patch, MagicMock
-from Room.models import Room, RoomXElements
+from datetime import time
+from Room.models import Room, RoomSlot, RoomXElements
+from Room.slots import SLOT_COUNT, decodeSlot, encodeSlot
 from RecreativeElement.models import RecreativeElement
 from Exceptions.customException import customException, exception
 
 class TestRoom(TestCase):
     def setUp(self):
+        cache.clear()
         self.element1 = RecreativeElement.objects.create(name="Mesa de Ping Pong", quantity=2)
         self.element2 = RecreativeElement.objects.create(name="Futbolín", quantity=1)
 
         self.room = Room.objects.create(
             location="Edificio A",
             capacity=10,
-            state="Disponible",
             description="Sala de reuniones"
         )
 
@@ -37,11 +44,29 @@ class TestRoom(TestCase):
         self.assertEqual(str(context.exception), exception.ROOMALREADY_RESERVED)
 
     def test_invalid_availability_format(self):
-        self.room.availability = [[0] * 5 for _ in range(8)]
         with self.assertRaises(customException) as context:
-            self.room.clean()
+            self.room.availability = [[0] * 5 for _ in range(8)]
         self.assertEqual(str(context.exception), exception.INVALID_ROOMAVAILABILITY)
 
+    def test_availability_matrix_round_trip(self):
+        grid = [[0] * 6 for _ in range(8)]
+        grid[2][3] = 1
+        grid[7][5] = 1
+        self.room.availability = grid
+        self.assertEqual(self.room.availability_mask, (1 << (2 * 6 + 3)) | (1 << (7 * 6 + 5)))
+        self.assertEqual(self.room.availability, grid)
+
+    def test_is_available_uses_slot_bit(self):
+        self.room.availability_mask = 1 << (Room.HOURS["10:00-11:30"] * 6 + Room.DAYS["Martes"])
+        self.assertFalse(self.room.is_available("Martes", "10:00-11:30"))
+        self.assertTrue(self.room.is_available("Lunes", "10:00-11:30"))
+
+    def test_check_if_room_is_fully_booked(self):
+        self.room.availability_mask = Room.FULLY_BOOKED_MASK & ~1
+        self.assertFalse(self.room.checkIfRoomIsFullyBooked())
+        self.room.availability_mask = Room.FULLY_BOOKED_MASK
+        self.assertTrue(self.room.checkIfRoomIsFullyBooked())
+
     def test_get_room_availability_success(self):
         availability = self.room.getRoomAvailability(self.room.id)
         self.assertEqual(availability, [[0] * 6 for _ in range(8)])
@@ -63,3 +88,277 @@ class TestRoom(TestCase):
 
         self.assertEqual(sorted(result, key=lambda x: x['name']),
                          sorted(expected, key=lambda x: x['name']))
+
+    def test_reserve_room_creates_slot(self):
+        self.room.reserveRoom("Martes", "10:00-11:30")
+        self.assertTrue(RoomSlot.objects.filter(
+            room=self.room, day_index=Room.DAYS["Martes"], hour_index=Room.HOURS["10:00-11:30"]
+        ).exists())
+
+        self.assertTrue(self.room.releaseRoom("Martes", "10:00-11:30"))
+        self.assertFalse(self.room.slots.exists())
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.availability_mask, 0)
+
+    def test_free_at_excludes_rooms_with_slot(self):
+        other = Room.objects.create(location="Edificio C", capacity=5, description="")
+        self.room.reserveRoom("Martes", "10:00-11:30")
+
+        free = Room.objects.free_at(Room.DAYS["Martes"], Room.HOURS["10:00-11:30"])
+        self.assertEqual(list(free.values_list('id', flat=True)), [other.id])
+
+    def test_saving_availability_syncs_slots(self):
+        grid = [[0] * 6 for _ in range(8)]
+        grid[1][4] = 1
+        self.room.availability = grid
+        self.room.save()
+        self.assertEqual(list(self.room.slots.values_list('day_index', 'hour_index')), [(4, 1)])
+
+
+@skipUnless(connection.vendor == 'postgresql', "needs row locks and concurrent writers")
+class TestRoomReservationContention(TransactionTestCase):
+    """
+    Contention benchmark: many parallel bookings race for the same room and
+    exactly one of them must win each slot.
+    """
+    WORKERS = 16
+    ATTEMPTS_PER_SLOT = 8
+
+    def setUp(self):
+        self.room = Room.objects.create(location="Edificio B", capacity=20, description="Sala de juegos")
+
+    def _book(self, day, hour):
+        try:
+            return Room.objects.get(id=self.room.id).reserveRoom(day, hour)
+        except customException:
+            return False
+        finally:
+            connection.close()
+
+    def test_parallel_bookings_one_winner_per_slot(self):
+        slots = [(day, hour) for day in list(Room.DAYS)[:2] for hour in list(Room.HOURS)[:4]]
+        attempts = slots * self.ATTEMPTS_PER_SLOT
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(lambda slot: self._book(*slot), attempts))
+
+        wins = {}
+        for slot, won in zip(attempts, results):
+            wins[slot] = wins.get(slot, 0) + int(won)
+        self.assertEqual(wins, {slot: 1 for slot in slots})
+
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.availability_mask.bit_count(), len(slots))
+        for day, hour in slots:
+            self.assertFalse(self.room.is_available(day, hour))
+
+
+class TestRoomSearch(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.projector = RecreativeElement.objects.create(name="Proyector", quantity=3)
+        self.small = Room.objects.create(location="Edificio A", capacity=10, description="")
+        self.large = Room.objects.create(location="Edificio B", capacity=40, description="")
+        self.booked = Room.objects.create(location="Edificio C", capacity=40, description="")
+        RoomXElements.objects.create(room=self.large, element=self.projector, amount=1)
+        RoomXElements.objects.create(room=self.booked, element=self.projector, amount=1)
+        self.booked.reserveRoom("Martes", "10:00-11:30")
+
+    def test_search_filters_slot_capacity_and_elements(self):
+        response = self.client.get('/room/search/', {
+            'day': 'Martes', 'hour_block': '10:00-11:30',
+            'min_capacity': 30, 'elements': str(self.projector.id)
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': self.large.id, 'location': 'Edificio B'}])
+
+    def test_search_requires_valid_slot(self):
+        response = self.client.get('/room/search/', {'day': 'Domingo', 'hour_block': '10:00-11:30'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_accepts_slot_aliases(self):
+        response = self.client.get('/room/search/', {'day': '2', 'hour_block': '10:00', 'min_capacity': 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['id'] for room in response.data['results']], [self.large.id])
+
+
+class TestSlotCodec(TestCase):
+    def test_code_is_the_mask_bit(self):
+        room = Room.objects.create(location="Edificio A", capacity=10, description="")
+        room.reserveRoom("Miércoles", "8:30-10:00")
+        room.refresh_from_db()
+        self.assertEqual(room.availability_mask, 1 << encodeSlot("Miércoles", "8:30-10:00"))
+
+    def test_aliases_share_a_code(self):
+        code = encodeSlot("Miércoles", "7:00-8:30")
+        self.assertEqual(code, 2)
+        for day, hour in [("miercoles", "07:00"), ("3", "07:00-08:30"), (3, time(7, 0)), (" MIÉRCOLES ", "7:00")]:
+            self.assertEqual(encodeSlot(day, hour), code, (day, hour))
+        self.assertEqual(decodeSlot(code), ("Miércoles", "7:00-8:30"))
+
+    def test_unknown_values_have_no_code(self):
+        self.assertIsNone(encodeSlot("Domingo", "7:00-8:30"))
+        self.assertIsNone(encodeSlot("Lunes", "7:15"))
+        self.assertIsNone(encodeSlot(None, None))
+        self.assertIsNone(encodeSlot(["Lunes"], "7:00"))
+        self.assertEqual(sorted(encodeSlot(*decodeSlot(code)) for code in range(SLOT_COUNT)), list(range(SLOT_COUNT)))
+
+
+class TestRoomListQueries(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.element = RecreativeElement.objects.create(name="Ajedrez", quantity=4)
+
+    def _create_rooms(self, count):
+        for index in range(count):
+            room = Room.objects.create(location=f"Sala {index}", capacity=10, description="")
+            RoomXElements.objects.create(room=room, element=self.element, amount=1)
+
+    def test_list_query_count_is_constant(self):
+        self._create_rooms(2)
+        with self.assertNumQueries(4):
+            response = self.client.get('/room/')
+        self.assertEqual(len(response.data['results']), 2)
+
+        self._create_rooms(10)
+        with self.assertNumQueries(4):
+            response = self.client.get('/room/')
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(response.data['results'][0]['elementos'][0]['element_details']['item_name'], "Ajedrez")
+
+    def test_list_is_cursor_paginated(self):
+        self._create_rooms(3)
+        response = self.client.get('/room/', {'page_size': 2})
+        self.assertEqual([room['location'] for room in response.data['results']], ["Sala 0", "Sala 1"])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([room['location'] for room in response.data['results']], ["Sala 2"])
+        self.assertIsNone(response.data['next'])
+
+    def test_sparse_fields(self):
+        self._create_rooms(3)
+        with self.assertNumQueries(3):
+            response = self.client.get('/room/', {'fields': 'id,location'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'location'})
+
+        with self.assertNumQueries(4):
+            response = self.client.get('/room/', {'expand': 'elementos'})
+        room = response.data['results'][0]
+        self.assertNotIn('availability', room)
+        self.assertEqual(room['capacity'], 10)
+        self.assertEqual(room['elementos'][0]['amount'], 1)
+
+
+class TestRoomAvailabilityCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.room = Room.objects.create(location="Edificio D", capacity=8, description="")
+
+    def test_availability_is_read_through_cache(self):
+        with self.assertNumQueries(1):
+            Room.cachedAvailabilityMask(self.room.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(Room.cachedAvailabilityMask(self.room.id), 0)
+
+    def test_reserve_room_invalidates_cache(self):
+        Room.cachedAvailabilityMask(self.room.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.reserveRoom("Lunes", "7:00-8:30")
+        self.assertEqual(self.room.getRoomAvailability(self.room.id)[0][0], 1)
+
+    def test_disponibilidad_answers_304_for_matching_etag(self):
+        response = self.client.get(f'/room/{self.room.id}/disponibilidad/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/room/{self.room.id}/disponibilidad/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.reserveRoom("Martes", "8:30-10:00")
+        response = self.client.get(f'/room/{self.room.id}/disponibilidad/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['availability'][1][1], 1)
+
+    def test_disponibilidad_unknown_room(self):
+        response = self.client.get('/room/9999/disponibilidad/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TestRoomListConditionalGet(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.room = Room.objects.create(location="Edificio E", capacity=15, description="")
+
+    def test_unchanged_collection_answers_304(self):
+        response = self.client.get('/room/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/room/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_reservation_changes_etag(self):
+        etag = self.client.get('/room/')['ETag']
+        self.room.reserveRoom("Jueves", "13:00-14:30")
+        self.assertEqual(self.client.get('/room/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_room_edit_changes_etag(self):
+        etag = self.client.get('/room/')['ETag']
+        response = self.client.put(f'/room/{self.room.id}/', {"location": "Edificio B"}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/room/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['location'], "Edificio B")
+
+    def test_element_change_changes_etag(self):
+        etag = self.client.get('/room/')['ETag']
+        element = RecreativeElement.objects.create(name="Billar", quantity=1)
+        RoomXElements.objects.create(room=self.room, element=element, amount=1)
+        response = self.client.get('/room/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class TestRoomWeeklyOccupancy(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.room_a = Room.objects.create(location="Bloque F", capacity=10, description="")
+        self.room_b = Room.objects.create(location="Bloque G", capacity=30, description="")
+        self.room_a.reserveRoom("Lunes", "7:00-8:30")
+        self.room_b.reserveRoom("Lunes", "7:00-8:30")
+        self.room_b.reserveRoom("Sabado", "17:30-19:00")
+
+    def _cell(self, data, day, hour_block):
+        return next(cell for cell in data['occupancy'] if cell['day'] == day and cell['hour_block'] == hour_block)
+
+    def test_weekly_occupancy_in_one_query(self):
+        with self.assertNumQueries(1):
+            data = Room.objects.weekly_occupancy()
+        self.assertEqual(data['total_rooms'], 2)
+        self.assertEqual(len(data['occupancy']), 48)
+        self.assertEqual(self._cell(data, "Lunes", "7:00-8:30"),
+                         {'day': "Lunes", 'hour_block': "7:00-8:30", 'booked': 2, 'free': 0, 'utilization': 100.0})
+        self.assertEqual(self._cell(data, "Sabado", "17:30-19:00")['utilization'], 50.0)
+        self.assertEqual(self._cell(data, "Martes", "7:00-8:30")['booked'], 0)
+
+    def test_endpoint_filters_and_caches_until_booking_change(self):
+        response = self.client.get('/room/ocupacion/', {'min_capacity': 20})
+        self.assertEqual(response.data['total_rooms'], 1)
+
+        with self.assertNumQueries(0):
+            self.client.get('/room/ocupacion/', {'min_capacity': 20})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room_b.reserveRoom("Martes", "7:00-8:30")
+        response = self.client.get('/room/ocupacion/', {'min_capacity': 20})
+        self.assertEqual(self._cell(response.data, "Martes", "7:00-8:30")['booked'], 1)
+
+    def test_capacity_edit_drops_the_cached_occupancy(self):
+        self.assertEqual(self.client.get('/room/ocupacion/', {'min_capacity': 20}).data['total_rooms'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/room/{self.room_a.id}/', {"capacity": 25}, format='json')
+        self.assertEqual(self.client.get('/room/ocupacion/', {'min_capacity': 20}).data['total_rooms'], 2)
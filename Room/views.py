@@ -1,19 +1,54 @@
+from datetime import date
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .serializer import RoomXElementsSerializer, RoomWriteSerializer, RoomReadSerializer
-from .models import Room, RoomXElements
+from django.db.models import Exists, OuterRef
+from django.utils.http import parse_etags
+from .serializer import RoomXElementsSerializer, RoomWriteSerializer, RoomReadSerializer, RoomSearchSerializer
+from .models import Room, RoomXElements, decodeAvailability
+from RecreativeElement.models import RecreativeElement
+from Reservation.models import ReservationSeries
+from Reservation.recurrence import bookingsBetween
+from config.conditional import collectionEtag, notModified
+from config.fields import renderedFields, sparseSelection
+from django.core.cache import cache
+from .cache import AVAILABILITY_TIMEOUT, occupancyKey
+from .analytics import loadGrids, utilizationReport
+from .slots import dayIndex, hourIndex
+
 
 
 class RoomViewSet(viewsets.ModelViewSet):
     queryset = Room.objects.all()
-    
+
+    def get_queryset(self):
+        if self.action in ['list', 'retrieve']:
+            fields, expand = sparseSelection(self.request)
+            if fields is None and expand is None:
+                return Room.objects.with_elements()
+            return Room.objects.for_fields(renderedFields(RoomReadSerializer, fields, expand))
+        return super().get_queryset()
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         return Response({'message': 'Sala creada exitosamente'}, status=status.HTTP_201_CREATED)
 
+    def list(self, request, *args, **kwargs):
+        """
+        Listar salas. ``fields`` (ej. "id,location") y ``expand`` (ej.
+        "elementos") limitan los campos; availability y elementos solo se
+        incluyen si se piden cuando se usa ``expand``.
+        """
+        etag = collectionEtag(request, Room.objects.all(), RecreativeElement.objects.all())
+        cached = notModified(request, etag)
+        if cached:
+            return cached
+        response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
     def get_serializer_class(self):
         if self.action in ["create", "update"]:
             return RoomWriteSerializer
@@ -25,9 +60,167 @@ class RoomViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'], url_path='disponibilidad')
     def disponibilidad(self, request, pk=None):
-        room = self.get_object()
-        return Response({'availability': room.availability})
+        """
+        Disponibilidad semanal de la sala.
+
+        Query params:
+            week: cualquier fecha (YYYY-MM-DD) de la semana a consultar; incluye
+                  las reservas con fecha y las series de esa semana además de las semanales
+        """
+        week_start = None
+        if request.query_params.get('week'):
+            try:
+                week_start = Room.weekStart(date.fromisoformat(request.query_params['week']))
+            except ValueError:
+                return Response({'error': 'La semana debe tener formato YYYY-MM-DD'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            mask = Room.cachedAvailabilityMask(int(pk), week_start)
+        except (Room.DoesNotExist, ValueError):
+            return Response({'error': 'Sala no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        if week_start is not None:
+            mask |= ReservationSeries.objects.week_mask(pk, week_start)
+
+        etag = f'"{pk}-{mask:x}"' if week_start is None else f'"{pk}-{week_start:%Y%m%d}-{mask:x}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({'availability': decodeAvailability(mask)})
+        response['ETag'] = etag
+        return response
     
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        Buscar salas libres en un día y bloque horario.
+
+        Query params:
+            day: Día de la semana (ej. "Martes" o día ISO 2)
+            hour_block: Bloque horario (ej. "10:00-11:30" o "10:00")
+            min_capacity: Capacidad mínima (opcional)
+            elements: IDs de elementos requeridos separados por coma (opcional)
+        """
+        day = request.query_params.get('day')
+        hour_block = request.query_params.get('hour_block')
+        day_index = dayIndex(day)
+        hour_index = hourIndex(hour_block)
+        if day_index is None or hour_index is None:
+            return Response(
+                {'error': 'Se requiere un día (day) y bloque horario (hour_block) válidos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            min_capacity = int(request.query_params.get('min_capacity', 0))
+            element_ids = [int(element_id) for element_id in
+                           request.query_params.get('elements', '').split(',') if element_id]
+        except ValueError:
+            return Response(
+                {'error': 'min_capacity y elements deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rooms = Room.objects.free_at(day_index, hour_index)
+        if min_capacity:
+            rooms = rooms.filter(capacity__gte=min_capacity)
+        for element_id in set(element_ids):
+            rooms = rooms.filter(Exists(RoomXElements.objects.filter(
+                room=OuterRef('pk'), element_id=element_id
+            )))
+        rooms = rooms.only('id', 'location')
+
+        page = self.paginate_queryset(rooms)
+        serializer = RoomSearchSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='ocupacion')
+    def ocupacion(self, request):
+        """
+        Ocupación semanal por día y bloque horario.
+
+        Query params:
+            min_capacity: Capacidad mínima (opcional)
+            location: Texto contenido en la ubicación (opcional)
+        """
+        try:
+            min_capacity = int(request.query_params.get('min_capacity', 0))
+        except ValueError:
+            return Response(
+                {'error': 'min_capacity debe ser un número entero'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        location = request.query_params.get('location', '')
+
+        key = occupancyKey(min_capacity, location)
+        data = cache.get(key)
+        if data is None:
+            rooms = Room.objects.all()
+            if min_capacity:
+                rooms = rooms.filter(capacity__gte=min_capacity)
+            if location:
+                rooms = rooms.filter(location__icontains=location)
+            data = rooms.weekly_occupancy()
+            cache.set(key, data, AVAILABILITY_TIMEOUT)
+        return Response(data)
+
+    @action(detail=False, methods=['get'], url_path='utilizacion')
+    def utilizacion(self, request):
+        """
+        Utilización de las salas: por bloque horario, por día, por horario,
+        bloques pico y salas sin reservas.
+
+        Query params:
+            min_capacity: Capacidad mínima (opcional)
+            peaks: Número de bloques pico (opcional, 3 por defecto)
+            idle_limit: Máximo de salas sin uso listadas (opcional, 100 por defecto)
+        """
+        try:
+            min_capacity = int(request.query_params.get('min_capacity', 0))
+            peaks = int(request.query_params.get('peaks', 3))
+            idle_limit = int(request.query_params.get('idle_limit', 100))
+        except ValueError:
+            return Response(
+                {'error': 'min_capacity, peaks e idle_limit deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if peaks < 0 or idle_limit < 0:
+            return Response(
+                {'error': 'peaks e idle_limit no pueden ser negativos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rooms = Room.objects.all()
+        if min_capacity:
+            rooms = rooms.filter(capacity__gte=min_capacity)
+        room_ids, grids = loadGrids(rooms)
+        return Response(utilizationReport(
+            room_ids, grids, list(Room.HOURS), list(Room.DAYS), peaks=peaks, idle_limit=idle_limit
+        ))
+
+    @action(detail=True, methods=['get'], url_path='reservas')
+    def reservas(self, request, pk=None):
+        """
+        Reservas con fecha de la sala en un rango de fechas, incluyendo cada
+        ocurrencia de las series (marcadas con series=True).
+
+        Query params:
+            start, end: fechas YYYY-MM-DD (inclusive)
+        """
+        try:
+            start = date.fromisoformat(request.query_params.get('start', ''))
+            end = date.fromisoformat(request.query_params.get('end', ''))
+        except ValueError:
+            return Response({'error': 'start y end deben tener formato YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            room_id = int(pk)
+        except ValueError:
+            room_id = None
+        if room_id is None or not Room.objects.filter(id=room_id).exists():
+            return Response({'error': 'Sala no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({'reservas': list(bookingsBetween(room_id, start, end))})
+
     @action(detail=True, methods=['get'], url_path='elementos')
     def elementos(self, request, pk=None):
         room = self.get_object()
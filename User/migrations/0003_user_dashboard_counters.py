@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:08
+
+from django.db import migrations, models
+from django.utils import timezone
+
+INACTIVE_STATES = ("Cancelada", "Terminada")
+
+
+def remaining_units(remaining):
+    """
+    Units not yet returned per element, as Register.models.remainingUnits
+    parsed them when this migration was written.
+    """
+    items = remaining if isinstance(remaining, list) else [remaining]
+    units = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            element_id = int(item.get('codigo'))
+            amount = int(item.get('cantidad', 0))
+        except (TypeError, ValueError):
+            continue
+        if amount > 0:
+            units[element_id] = units.get(element_id, 0) + amount
+    return units
+
+
+def backfill_dashboard_counters(apps, schema_editor):
+    User = apps.get_model('User', 'User')
+    Reservation = apps.get_model('Reservation', 'Reservation')
+    Register = apps.get_model('Register', 'Register')
+    today = timezone.localdate()
+    summaries = {}
+    active = Reservation.objects.exclude(state__in=INACTIVE_STATES) \
+        .values_list('user_id', 'reserved_date', 'slot_code').iterator()
+    for user_id, reserved_date, slot_code in active:
+        summary = summaries.setdefault(user_id, {'active': 0, 'units': 0, 'slots': []})
+        summary['active'] += 1
+        if slot_code is not None and (reserved_date is None or reserved_date >= today):
+            summary['slots'].append([reserved_date and reserved_date.isoformat(), slot_code])
+    registers = Register.objects.values_list('reservationId__user_id', 'remainingElements').iterator()
+    for user_id, remaining in registers:
+        summary = summaries.setdefault(user_id, {'active': 0, 'units': 0, 'slots': []})
+        summary['units'] += sum(remaining_units(remaining).values())
+    for user_id, summary in summaries.items():
+        User.objects.filter(id=user_id).update(
+            active_reservations=summary['active'], unreturned_units=summary['units'],
+            upcoming_slots=summary['slots']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('User', '0002_user_updated_at'),
+        ('Reservation', '0011_reservation_filter_indexes'),
+        ('Register', '0003_backfill_unreturned_quantity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='active_reservations',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='unreturned_units',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='upcoming_slots',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_dashboard_counters, migrations.RunPython.noop),
+    ]
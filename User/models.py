@@ -1,7 +1,10 @@
+from datetime import date, timedelta
 from django.contrib.auth.models import AbstractUser, Group, Permission 
 from django.db import models
+from django.utils import timezone
 from User.roles import roles
 from RecreativeElement.models import RecreativeElement
+from Room.slots import DAYS, decodeSlot
 
 class User(AbstractUser):
     id = models.CharField(primary_key=True, max_length=15, blank=False)
@@ -15,6 +18,13 @@ class User(AbstractUser):
         related_name='users',
         blank=True
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Dashboard counters, kept by Reservation.save, its pre_delete signal and Register.save/delete
+    active_reservations = models.PositiveIntegerField(default=0)
+    unreturned_units = models.PositiveIntegerField(default=0)
+    # [reserved_date ISO or None for weekly, slot_code] of each active reservation
+    upcoming_slots = models.JSONField(default=list, blank=True)
 
     groups = models.ManyToManyField(
         Group,
@@ -34,4 +44,37 @@ class User(AbstractUser):
     )
 
     def __str__(self):
-        return f"{self.id} - {self.name}"
\ No newline at end of file
+        return f"{self.id} - {self.name}"
+
+    @staticmethod
+    def pruneSlots(slots, today=None):
+        """
+        upcoming_slots without the dated entries already past.
+        """
+        today = (today or timezone.localdate()).isoformat()
+        return [slot for slot in slots if slot[0] is None or slot[0] >= today]
+
+    def nextSlots(self, today=None):
+        """
+        Upcoming slots in calendar order, weekly ones on their next occurrence.
+
+        Returns:
+            list: dicts with reserved_day, reserved_hour_block, reserved_date
+                and weekly (True for reservations that repeat every week).
+        """
+        today = today or timezone.localdate()
+        upcoming = []
+        for reserved_date, code in self.pruneSlots(self.upcoming_slots, today):
+            day, hour_block = decodeSlot(code)
+            weekly = reserved_date is None
+            if weekly:
+                day_index = DAYS.index(day)
+                next_date = today + timedelta(days=(day_index - today.weekday()) % 7)
+            else:
+                next_date = date.fromisoformat(reserved_date)
+            upcoming.append((next_date, code // len(DAYS), {
+                'reserved_day': day, 'reserved_hour_block': hour_block,
+                'reserved_date': next_date.isoformat(), 'weekly': weekly,
+            }))
+        upcoming.sort(key=lambda slot: slot[:2])
+        return [slot for _, _, slot in upcoming]
\ No newline at end of file
@@ -38,4 +38,28 @@ class UserSerializer(serializers.ModelSerializer):
             data['name'] = data.pop('full_name')
         if 'email_address' in data:
             data['email'] = data.pop('email_address')
-        return super().to_internal_value(data)
\ No newline at end of file
+        return super().to_internal_value(data)
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """
+    "Mis reservas" dashboard, read from the user's denormalized counters.
+    """
+    upcoming_slots = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'name', 'active_reservations', 'unreturned_units', 'upcoming_slots']
+
+    def get_upcoming_slots(self, instance):
+        return instance.nextSlots()
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        return {
+            'user_id': data['id'],
+            'full_name': data['name'],
+            'active_reservations': data['active_reservations'],
+            'unreturned_units': data['unreturned_units'],
+            'upcoming_slots': data['upcoming_slots'],
+        }
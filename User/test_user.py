@@ -0,0 +1,77 @@
+from datetime import date
+from django.test import TestCase
+from rest_framework.test import APIClient
+from Register.models import Register
+from Reservation.models import Reservation
+from RecreativeElement.models import RecreativeElement
+from Room.models import Room
+from User.models import User
+
+
+class TestUserSummary(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(
+            id="7000", username="resumen", idNum="7000", name="Resumen",
+            email="resumen@mail.escuelaing.edu.co", role="STUDENT"
+        )
+        self.room = Room.objects.create(location="Sala R", capacity=10, description="")
+        self.ball = RecreativeElement.objects.create(name="Balón", quantity=5)
+
+    def _post(self, **slot):
+        response = self.client.post('/reservation/', dict({
+            "location": "Sala R", "state": "Confirmada", "user": self.user.id, "room": self.room.id,
+        }, **slot), format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def _summary(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/user/{self.user.id}/resumen/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counters_follow_reservation_changes(self):
+        weekly = self._post(reserved_day="Lunes", reserved_hour_block="10:00-11:30")
+        self._post(reserved_date="2030-03-05", reserved_hour_block="7:00-8:30")
+        summary = self._summary()
+        self.assertEqual(summary['active_reservations'], 2)
+        self.assertEqual(
+            [(slot['reserved_day'], slot['reserved_hour_block'], slot['weekly']) for slot in summary['upcoming_slots']],
+            [("Lunes", "10:00-11:30", True), ("Martes", "7:00-8:30", False)]
+        )
+
+        self.client.patch(f'/reservation/{weekly}/', {"state": "Cancelada"}, format='json')
+        summary = self._summary()
+        self.assertEqual(summary['active_reservations'], 1)
+        self.assertEqual([slot['reserved_date'] for slot in summary['upcoming_slots']], ["2030-03-05"])
+
+        self.client.delete(f'/reservation/{weekly}/')
+        self.assertEqual(self._summary()['active_reservations'], 1)
+
+    def test_deleting_the_room_releases_its_bookings(self):
+        self._post(reserved_day="Lunes", reserved_hour_block="10:00-11:30")
+        self.assertEqual(self.client.delete(f'/room/{self.room.id}/').status_code, 204)
+        summary = self._summary()
+        self.assertEqual(summary['active_reservations'], 0)
+        self.assertEqual(summary['upcoming_slots'], [])
+
+    def test_unreturned_units_follow_registers(self):
+        reservation = Reservation.objects.get(id=self._post(reserved_day="Lunes", reserved_hour_block="7:00-8:30"))
+        register = Register.objects.create(
+            reservationId=reservation, returnedElements=[],
+            remainingElements=[{'codigo': str(self.ball.id), 'nombre': "Balón", 'estado': "NOT_RETURNED", 'cantidad': 2}]
+        )
+        self.assertEqual(self._summary()['unreturned_units'], 2)
+        register.delete()
+        self.assertEqual(self._summary()['unreturned_units'], 0)
+
+    def test_past_dated_slots_are_not_upcoming(self):
+        self.user.upcoming_slots = [["2020-01-06", 0], [None, 1]]
+        self.assertEqual(
+            self.user.nextSlots(today=date(2030, 3, 4)),
+            [{'reserved_day': "Martes", 'reserved_hour_block': "7:00-8:30", 'reserved_date': "2030-03-05", 'weekly': True}]
+        )
+
+    def test_unknown_user(self):
+        self.assertEqual(self.client.get('/user/nadie/resumen/').status_code, 404)
@@ -1,31 +1,50 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from config.pagination import DefaultCursorPagination
 from .models import User
-from .serializers import UserSerializer
+from .serializers import UserSerializer, UserSummarySerializer
 
 class UserView(APIView):
+    cursor_ordering = 'id'
+
     def get(self, request, identifier=None):
         """
         Get Users by id or name or get all Users.
         """
         if identifier:
             return self.getUserByIdOrName(request, identifier)
-        users = User.objects.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        users = User.objects.prefetch_related('recreativeElements')
+        paginator = DefaultCursorPagination()
+        page = paginator.paginate_queryset(users, request, view=self)
+        serializer = UserSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def getUserByIdOrName(self, request, identifier):
         """
         Get Users by id or name.
         """
         try:
-            user = User.objects.filter(id=identifier).first() or \
-                   User.objects.filter(name=identifier).first()
+            users = User.objects.prefetch_related('recreativeElements')
+            user = users.filter(id=identifier).first() or users.filter(name=identifier).first()
             if not user:
                 return Response({"error": "Usuario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
             serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class UserSummaryView(APIView):
+    def get(self, request, identifier):
+        """
+        Resumen de reservas del usuario: reservas activas, elementos sin
+        devolver y próximos horarios, en una sola consulta por llave primaria.
+        """
+        user = User.objects.only(
+            'id', 'name', 'active_reservations', 'unreturned_units', 'upcoming_slots'
+        ).filter(id=identifier).first()
+        if not user:
+            return Response({"error": "Usuario no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(UserSummarySerializer(user).data, status=status.HTTP_200_OK)
@@ -0,0 +1,32 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def collectionEtag(request, *querysets):
+    """
+    Cheap ETag for a list response.
+
+    Each queryset contributes one aggregate query, ``COUNT`` plus
+    ``MAX(updated_at)``. Pass the listed model and every model nested in its
+    representation. The request path (cursor, page size, filters) is part of
+    the tag because it changes what is listed.
+    """
+    parts = [request.get_full_path()]
+    for queryset in querysets:
+        summary = queryset.order_by().aggregate(count=Count('pk'), last=Max('updated_at'))
+        last = summary['last'].isoformat() if summary['last'] else ''
+        parts.append(f"{queryset.model._meta.label}:{summary['count']}:{last}")
+    return '"%s"' % hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def notModified(request, etag):
+    """
+    A 304 response when the request's If-None-Match already carries ``etag``, else None.
+    """
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return None
@@ -0,0 +1,80 @@
+def parseFieldList(value):
+    """
+    Tree of a comma separated list of (dotted) field names.
+
+    "id,room_details.location" -> {'id': {}, 'room_details': {'location': {}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def sparseSelection(request):
+    """
+    (fields, expand) trees from the ``fields`` and ``expand`` query params,
+    None for a param that is not present.
+    """
+    params = getattr(request, 'query_params', {})
+    fields = parseFieldList(params['fields']) if params.get('fields') else None
+    expand = parseFieldList(params['expand']) if 'expand' in params else None
+    return fields, expand
+
+
+def childSelection(fields, expand, name):
+    """
+    Selection applied inside the nested field ``name``: only its listed
+    subfields (all when it was listed without any) and its listed expansions.
+    """
+    return (fields.get(name) or None) if fields else None, \
+        (expand.get(name, {}) if expand is not None else None)
+
+
+def renderedFields(serializer_class, fields, expand):
+    """
+    Names of ``serializer_class``'s fields rendered under a selection.
+
+    Without either param every field is rendered. ``fields`` keeps only the
+    listed fields. Fields in ``Meta.expandable`` (nested objects, the heavy
+    part) are dropped as soon as ``expand`` is given, unless listed in it or
+    in ``fields``.
+    """
+    expandable = getattr(serializer_class.Meta, 'expandable', ())
+    rendered = []
+    for name in serializer_class.Meta.fields:
+        listed = fields is not None and name in fields
+        expanded = expand is not None and name in expand
+        if name in expandable and expand is not None:
+            keep = listed or expanded
+        else:
+            keep = fields is None or listed or expanded
+        if keep:
+            rendered.append(name)
+    return rendered
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin rendering only the fields selected by the request's
+    ``fields`` and ``expand`` query params (see renderedFields). Nested
+    serializers using the mixin get the dotted part of the selection.
+    """
+    def get_fields(self):
+        declared = super().get_fields()
+        request = self.context.get('request')
+        if request is None:
+            return declared
+
+        path, node = [], self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        fields, expand = sparseSelection(request)
+        for name in reversed(path):
+            fields, expand = childSelection(fields, expand, name)
+
+        rendered = set(renderedFields(type(self), fields, expand))
+        return {name: field for name, field in declared.items() if name in rendered}
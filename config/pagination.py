@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DefaultCursorPagination(CursorPagination):
+    """
+    Keyset pagination shared by every list endpoint.
+
+    Pages are fetched with ``WHERE <ordering> > <cursor>`` over the primary key,
+    so they stay stable under inserts and never scan skipped rows like OFFSET.
+    Views pick the ordering column with a ``cursor_ordering`` attribute.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        return (getattr(view, 'cursor_ordering', self.ordering),)
@@ -50,7 +50,9 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.DefaultCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 MIDDLEWARE = [
@@ -96,7 +98,22 @@ DATABASES = {
         'PASSWORD': 'ECI_BIENESTAR',
         'HOST':     'aws-0-us-east-2.pooler.supabase.com',
         'PORT':     '6543',
+        # The Supabase pooler on 6543 runs in transaction mode, which cannot
+        # keep server-side cursors (QuerySet.iterator) open across statements
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+    }
+}
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Room availability is cached here. Swap the backend for
+# 'django.core.cache.backends.redis.RedisCache' (LOCATION 'redis://127.0.0.1:6379')
+# to share it between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'salas-y-prestamos',
     }
 }
 
@@ -16,14 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from RecreativeElement.views import RecreativeElementView
+from RecreativeElement.views import RecreativeElementView, RecreativeElementAvailabilityView
 from Reservation.views import ReservationViewSet, ReservationElementViewSet  
 from Room.views import RoomViewSet, RoomXElementsViewSet
 from rest_framework.routers import DefaultRouter
 from django.urls import include
 
-from Register.views import RegisterView
-from User.views import UserView
+from Register.views import RegisterView, RegisterExportView
+from User.views import UserView, UserSummaryView
 
 router = DefaultRouter()
 router.register(r'room', RoomViewSet)
@@ -34,10 +34,13 @@ router.register(r'reservation-elements', ReservationElementViewSet)
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('recreative-elements/', RecreativeElementView.as_view(), name='element'),
+    path('recreative-elements/availability/', RecreativeElementAvailabilityView.as_view(), name='element-availability'),
     path('recreative-elements/<identifier>/', RecreativeElementView.as_view(), name='element-detail'),
     path('register/', RegisterView.as_view(), name='registers'),
+    path('register/export/', RegisterExportView.as_view(), name='register-export'),
     path('register/<int:identifier>/', RegisterView.as_view(), name='register-detail'),
     path('user/', UserView.as_view(), name='users'),
     path('user/<identifier>/', UserView.as_view(), name='user-detail'),
+    path('user/<identifier>/resumen/', UserSummaryView.as_view(), name='user-summary'),
 ] + router.urls 
 